@@ -66,8 +66,8 @@ class BDCCatalogPlugin(QObject):
 
         # Catalog Widget
         task_processor = TaskProcessor( self.iface, 'BDC Catalog' )
-        client = BDCStacClient()
-        self._processor = BDCStacProcessor( iface, task_processor, client )
+        self._client = BDCStacClient()
+        self._processor = BDCStacProcessor( iface, task_processor, self._client )
         self._config_collection = configCollection()
 
         self.catalog = None # initGui
@@ -101,6 +101,7 @@ class BDCCatalogPlugin(QObject):
         self.action.deleteLater()
 
         del self.catalog
+        self._client.close()
 
     @pyqtSlot(bool)
     def on_Clicked(self, enabled:bool)->None:
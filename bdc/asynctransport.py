@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Async Transport
+                            Asyncio transport for STAC (httpx)
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Callable, Coroutine, List
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2 # HTTP/2 for httpx
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+from .translate import tr
+from .ratelimit import RetryPolicy, HostRateLimiter
+
+
+class AsyncStacTransport():
+    """
+    Many requests in flight from a single worker thread, with pooled keep-alive connections.
+    One event loop (own thread) and one client are kept for the session, see 'close'.
+    The coroutines 'fetch' (response) and 'search' (JSON document) run in the loop of transport,
+    'run' is the blocking bridge of the worker threads.
+    httpx is optional, see 'isAvailable'.
+    Request args are the same of requests: url, params, json, method, headers, timeout, verify
+    """
+    def __init__(self,
+            stac_url:str,
+            verify:bool=True,
+            max_connections:int=10,
+            http2:bool=False,
+            timeout:float=10,
+            retry_policy:RetryPolicy=None,
+            rate_limiter:HostRateLimiter=None
+        ):
+        self.stac_url = stac_url
+        self.verify = verify
+        self.max_connections = max_connections
+        self.http2 = http2 and HAS_HTTP2
+        self.timeout = timeout
+        self.retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+        self.rate_limiter = HostRateLimiter() if rate_limiter is None else rate_limiter # Shared with the requests session
+        self._loop = None
+        self._thread = None
+        self._client = None # Created in the loop
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def isAvailable()->bool:
+        return not httpx is None
+
+    def client(self)->'httpx.AsyncClient':
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections
+        )
+        return httpx.AsyncClient(
+            limits=limits, http2=self.http2,
+            verify=self.verify, timeout=self.timeout
+        )
+
+    async def _fetchOnce(self, client:'httpx.AsyncClient', args:dict)->dict:
+        await self.rate_limiter.acquireAsync( args['url'] )
+        try:
+            response = await client.request(
+                args.get( 'method', 'GET' ), args['url'],
+                params=args.get('params'), json=args.get('json'),
+                headers=args.get('headers'), timeout=args.get( 'timeout', self.timeout )
+            )
+        except httpx.TimeoutException:
+            msg = tr("The request has timed out ({}).\nPlease check your internet connection or try again later").format( self.stac_url )
+            return { 'is_ok': False, 'is_retry': True, 'message': msg }
+        except httpx.TransportError as err:
+            return { 'is_ok': False, 'is_retry': True, 'message': str( err ) }
+        except httpx.HTTPError as err:
+            return { 'is_ok': False, 'is_retry': False, 'message': str( err ) }
+
+        self.rate_limiter.update( args['url'], response.status_code )
+        if response.status_code >= 400:
+            return {
+                'is_ok': False,
+                'is_retry': self.retry_policy.isRetry( response.status_code ),
+                'retry_after': response.headers.get('Retry-After'),
+                'status_code': response.status_code,
+                'message': f"{response.status_code} Error: {response.reason_phrase} for url: {response.url}"
+            }
+
+        return {
+            'is_ok': True,
+            'status_code': response.status_code,
+            'content': response.content,
+            'headers': response.headers,
+            'elapsed': response.elapsed.total_seconds()
+        }
+
+    async def fetch(self, args:dict, isCanceled:Callable[[], bool]=lambda: False)->dict:
+        """
+        { 'is_ok': True, 'status_code', 'content', 'headers', 'elapsed' } or { 'is_ok': False, 'message' }
+        Retry with backoff, the wait is interrupted by the cancel of task
+        """
+        if self._client is None:
+            self._client = self.client() # In the loop of transport
+        client = self._client
+        for attempt in range( self.retry_policy.retries + 1 ):
+            r = await self._fetchOnce( client, args )
+            if r['is_ok'] or not r['is_retry'] or attempt == self.retry_policy.retries:
+                break
+            end = time.monotonic() + self.retry_policy.delay( attempt, r.get('retry_after') )
+            while time.monotonic() < end:
+                if isCanceled():
+                    return { 'is_ok': False, 'is_retry': False, 'message': tr('Process cancelled by user') }
+                await asyncio.sleep( min( end - time.monotonic(), 0.2 ) )
+
+        return r
+
+    async def search(self, args:dict, isCanceled:Callable[[], bool]=lambda: False)->dict:
+        """
+        JSON document (page of search, collection): 'fetch' with the 'result' parsed and its 'size' (bytes)
+        """
+        r = await self.fetch( args, isCanceled )
+        if not r['is_ok'] or not r['status_code'] == 200:
+            return r
+        try:
+            result = json.loads( r['content'] )
+        except ValueError as err:
+            return { 'is_ok': False, 'is_retry': False, 'message': str( err ) }
+
+        return r | { 'result': result, 'size': len( r['content'] ) }
+
+    async def searchAll(self, list_args:List[dict], isCanceled:Callable[[], bool]=lambda: False)->List[dict]:
+        return await asyncio.gather( *[ self.search( args, isCanceled ) for args in list_args ] )
+
+    def _startLoop(self)->None:
+        with self._lock:
+            if not self._loop is None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread( target=self._loop.run_forever, daemon=True )
+            self._thread.start()
+
+    def run(self, coroutine:Coroutine)->Any:
+        """
+        Blocking call for a worker thread (QgsTask, refresh of metadata), the coroutine runs in the loop of transport
+        """
+        self._startLoop()
+        return asyncio.run_coroutine_threadsafe( coroutine, self._loop ).result()
+
+    def runAll(self, list_args:List[dict], isCanceled:Callable[[], bool]=lambda: False)->List[dict]:
+        return self.run( self.searchAll( list_args, isCanceled ) )
+
+    def close(self)->None:
+        with self._lock:
+            if self._loop is None:
+                return
+            if not self._client is None:
+                asyncio.run_coroutine_threadsafe( self._client.aclose(), self._loop ).result()
+                self._client = None
+            self._loop.call_soon_threadsafe( self._loop.stop )
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
@@ -17,10 +17,9 @@
  ***************************************************************************/
  """
 
-import json
-from typing import Callable
-
-from osgeo import gdal, ogr
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
 
 from qgis.core import Qgis
 
@@ -29,22 +28,15 @@ from qgis.PyQt.QtCore import pyqtSignal
 from .translate import tr
 
 from .stacclient import StacClient
+from .cache import HttpCache, FootprintCache, RasterMetaCache
+from .config import cacheFilepath
 from .vsicurl_open import openUrl
-
-def intersects(bbox: list, json_geom: dict)->bool:
-    geom = ogr.CreateGeometryFromJson( json.dumps( json_geom ) )
-    
-    ( min_x, min_y, max_x, max_y ) = bbox
-    ring = ogr.Geometry( ogr.wkbLinearRing )
-    ring.AddPoint_2D( min_x, min_y )
-    ring.AddPoint_2D( max_x, min_y )
-    ring.AddPoint_2D( max_x, max_y )
-    ring.AddPoint_2D( min_x, max_y )
-    ring.AddPoint_2D( min_x, min_y )
-    geom_bbox = ogr.Geometry( ogr.wkbPolygon )
-    geom_bbox.AddGeometry( ring )
-    
-    return geom_bbox.Intersects( geom )
+from .spatialfilter import SpatialFilter
+from .streamparser import SearchPage
+from .pageplanner import PagePlanner
+from .cogheader import crsFromItem, crsFromTiffHeader
+from .footprintengine import footprint
+from .vrtwriter import rasterMetaFromDataset
 
 
 class BDCStacClient(StacClient):
@@ -54,16 +46,18 @@ class BDCStacClient(StacClient):
         self.TAG_ATT = 'BDC'
         self.STAC_URL = 'https://data.inpe.br/bdc/stac/v1'
         self._verify_ssl = False
+        self.PROBE_WORKERS = 8 # Concurrent COG probes (CRS/footprint) per page
+        self.FOOTPRINT_ENGINE = 'numpy' # footprintengine: 'numpy' (overview/mask read once) or 'gdal' (gdal.Footprint)
 
-    def _setCollectionsCOGBandsMeta(self)->dict:
-        args = {
-            'url': f"{self.STAC_URL}/collections/{self.collection['id']}"
-        }
-        r = self._getResponse( args )
-        if not r['is_ok']:
-            return r
+        self._cache = HttpCache( cacheFilepath('bdc_http.sqlite') )
+        self._footprint_cache = FootprintCache( cacheFilepath('bdc_footprint.sqlite') )
+        self._raster_meta_cache = RasterMetaCache( cacheFilepath('bdc_raster_meta.sqlite') )
+
+    def close(self)->None:
+        super().close()
+        self._footprint_cache.close()
 
-        result = r['response'].json()
+    def _parseCollectionCOGBandsMeta(self, collection:dict, result:dict)->dict:
         assets = [ asset for asset, value in result['item_assets'].items() if 'profile=cloud-optimized' in value['type'] ]
         bands = {
             f"{item['name']},{item['common_name']}": {
@@ -79,9 +73,7 @@ class BDCStacClient(StacClient):
                    meta[ asset ] = { self._feat_key_spatial_res: sr }
                    break
 
-        self._collections_cog_bands_meta[ self.collection['id'] ]  = meta
-        
-        return { 'is_ok': True }
+        return meta
 
     def search(
             self,
@@ -89,93 +81,104 @@ class BDCStacClient(StacClient):
             dates:list,
             footprint_band:str,
             requestProcessData:pyqtSignal,
-            isCanceled:Callable[[str], None]
+            isCanceled:Callable[[str], None],
+            windows:List[tuple]=None,
+            addFeatures:Callable[[dict], None]=None
         )->dict:
-        def processResponse(response)->dict:
+        def getNextUrlFromResult(result:dict)->str:
+            links = result.get( 'links', [] )
+            return links[0]['href'] if ( len( links ) > 0 and links[0]['rel'] == 'next' ) else None
+
+        def processResult(page:SearchPage)->dict:
             def getCRS(ds)->dict:
                 sr = ds.GetSpatialRef()
                 return sr.GetAuthorityCode(None)
 
-            def getFootprint(dataset_url):
-                band = dataset_url.GetRasterBand(1)
-                overview = int(band.GetOverviewCount() / 2)
-                if band.GetNoDataValue() is None:
-                    band.SetNoDataValue( 0.0 )
-
-                (_, res_x, _, _, _, res_y) = dataset_url.GetGeoTransform()
-                mean_res = ( res_x + -1*res_y ) / 2
-                mean_size = ( dataset_url.RasterXSize + dataset_url.RasterXSize ) / 2 
-                factor = mean_res * mean_size / 100
-                factor /= 1120000 # meter->degree
-                    
-                wkt = gdal.Footprint(
-                    None, dataset_url,
-                    format='WKT', dstSRS="EPSG:4326",
-                    bands=[1], ovr=overview,
-                    simplify=factor, maxPoints=4, minRingArea=factor**2/2
-                )
-                # Return  Multpolygon
-                geom = ogr.CreateGeometryFromWkt( wkt )
-                geom_ = geom.GetGeometryRef(0)
-                json_geom = geom_.ExportToJson()
-
-                return json.loads( json_geom )
-                
             getNameFromFeature = lambda feature: feature['id']
             getCRSFromFeature = lambda feature: str( feature[ self._feat_key_crs ] )
 
-            if not response.status_code == 200:
-                response.close()
-                return {
-                    'is_ok': False,
-                    'message': response.text
-                }
+            def probeFeature(feat:dict)->dict:
+                # Run in worker thread: each probe opens its own GDAL dataset
+                if isCanceled():
+                    return {
+                        'is_ok': False,
+                        'message': tr('Process cancelled by user')
+                    }
 
-            result = response.json()
-            response.close()
+                url = f"{feat['assets'][ footprint_band ]['href']}"
+                # Null geometry (allowed by STAC): the footprint is read from the COG
+                exists_geom = self.collection['exists_geom'] and not feat['geometry'] is None
+                entry = self._footprint_cache.get( url )
+                if not entry is None and ( exists_geom or not entry['geometry'] is None ):
+                    return {
+                        'is_ok': True,
+                        'crs': entry['crs'],
+                        'geometry': feat['geometry'] if exists_geom else entry['geometry']
+                    }
+
+                if exists_geom:
+                    # Only the CRS: STAC projection extension or the header of TIFF (one small request)
+                    crs = crsFromItem( feat, footprint_band )
+                    if crs is None:
+                        crs = crsFromTiffHeader( self._fetchHeader( url ) )
+                        if not crs is None:
+                            self._footprint_cache.put( url, crs, None )
+                    if not crs is None:
+                        return {
+                            'is_ok': True,
+                            'crs': crs,
+                            'geometry': feat['geometry']
+                        }
+
+                r = openUrl( url )
+                if not r['is_ok']:
+                    return r
+
+                dataset_url = r['dataset']
+                if self._raster_meta_cache.get( url ) is None:
+                    # Used by the VRT of scene
+                    self._raster_meta_cache.put( url, rasterMetaFromDataset( dataset_url ) )
+                crs = getCRS( dataset_url )
+                geom = None if exists_geom else footprint( dataset_url, self.FOOTPRINT_ENGINE )
+                if geom is None:
+                    geom = feat['geometry']
+                dataset_url = None
+
+                self._footprint_cache.put( url, crs, None if exists_geom else geom )
 
-            if result['context']['matched'] == 0:
                 return {
                     'is_ok': True,
-                    'matched': result['context']['matched'],
-                    'returned': result['context']['returned']
+                    'crs': crs,
+                    'geometry': geom
                 }
-            
-            url_next = result['links'][0]['href'] if (len( result['links'] ) > 0 and result['links'][0]['rel'] == 'next') else None
-            features = {}
-            count = 0
-            total = len( result['features'] )
-            returned_check = 0
-            for feat in result['features']:
+
+            def consume(feat:dict, tier:str, future)->dict:
+                nonlocal count, returned_check
                 count += 1
 
-                text = tr("Request ({}) processing {} of {}").format( self._request_count, count, total )
+                text = tr("Request ({}) processing {} of {}").format( self._request_count, count, max( page.total, count ) )
                 requestProcessData.emit({
                     'type': 'message_status',
                     'data': text
                 })
                 requestProcessData.emit({
                     'type': 'progress_footprint',
-                    'data': { 'count': count, 'total': total }
+                    'data': { 'count': count, 'total': max( page.total, count ) }
                 })
 
-                url = f"{feat['assets'][ footprint_band ]['href']}"
-                r = openUrl( url )
+                if future is None:
+                    return { 'is_ok': True }
+
+                r = future.result()
                 if not r['is_ok']:
                     return r
 
-                dataset_url = r['dataset']
-                feat[ self._feat_key_crs ] = getCRS( dataset_url )
-
-                geom = feat['geometry']
-                if not self.collection['exists_geom']:
-                    geom = getFootprint( dataset_url )
-                    feat['geometry'] = geom
-                
-                dataset_url = None
+                feat[ self._feat_key_crs ] = r['crs']
+                geom = r['geometry']
+                feat['geometry'] = geom
 
-                if not intersects(bbox, geom ):
-                    continue
+                if tier == SpatialFilter.UNCERTAIN and not spatial_filter.intersects( geom ):
+                    return { 'is_ok': True }
 
                 returned_check += 1
 
@@ -194,41 +197,52 @@ class BDCStacClient(StacClient):
                         'message': tr('Process cancelled by user')
                     }
 
+                return { 'is_ok': True }
+
+            features = {}
+            count = 0
+            returned_check = 0
+            pending = deque() # ( feat, tier, future ) in the order of the page
+            executor = ThreadPoolExecutor( max_workers=self.PROBE_WORKERS )
+            try:
+                # Probes are submitted as the features arrive (streaming), results are consumed in order
+                for feat in page.features():
+                    tier = spatial_filter.classifyMany(
+                        [ feat.get('bbox') ], [ feat['geometry'] ], self.collection['exists_geom']
+                    )[0]
+                    future = None if tier == SpatialFilter.OUT else executor.submit( probeFeature, feat )
+                    pending.append( ( feat, tier, future ) )
+                    while len( pending ) and ( pending[0][2] is None or pending[0][2].done() ):
+                        r = consume( *pending.popleft() )
+                        if not r['is_ok']:
+                            return r
+
+                while len( pending ):
+                    r = consume( *pending.popleft() )
+                    if not r['is_ok']:
+                        return r
+            finally:
+                executor.shutdown( wait=True, cancel_futures=True )
+
+            if not page.is_ok:
+                return {
+                    'is_ok': False,
+                    'message': page.message
+                }
+
+            # Total of page known at the end (features returned)
+            requestProcessData.emit({
+                'type': 'progress_footprint',
+                'data': { 'count': count, 'total': max( page.total, count ) }
+            })
+
             return {
                 'is_ok': True,
-                'url_next': url_next,
-                'matched': result['context']['matched'],
+                'matched': PagePlanner.getMatched( page.result ), # None when the server has not the total
                 'returned': returned_check,
                 'features': features
             }
 
-        def searchStacItems()->dict:
-            p = {
-                'collections': [ self.collection['id'] ],
-                'limit': self.LIMIT,
-                'bbox': ','.join( str(f) for f in bbox ),
-                'datetime': f"{dates[0]}T00:00:00Z/{dates[1]}T00:00:00Z"
-            }
-            r = self._getResponse( {'url': f"{self.STAC_URL}/search", 'timeout': 10, 'params': p} )
-            if not r['is_ok']:
-                return r
-
-            return processResponse( r['response'] )
-
-        def fetchNextPage(url:str)->dict:
-            r = self._getResponse( {'url':url, 'timeout': 10} )
-            if not r['is_ok']:
-                return r
-
-            r = processResponse( r['response'] )
-            if not r['is_ok'] or r['returned'] == 0:
-                return r
-            
-            self._features |= r['features']
-
-            del r['features']
-            return r
-        
         def messageTotalFeatures(total:int)->None:
             filtered = len(self._features)
             msg = tr("STAC - Totals: {} received, {} - filtered").format( total, filtered )
@@ -237,68 +251,71 @@ class BDCStacClient(StacClient):
                 'data': { 'text': msg, 'level': Qgis.Info }
             })
 
-        r = self._setCollectionsCOGBandsMeta()
-        if not r['is_ok']:
+        def messageError(message:str)->None:
             requestProcessData.emit( {
                 'type': 'message_bar',
-                'data':{ 'text': r['message'], 'level': Qgis.Critical }
+                'data':{ 'text': message, 'level': Qgis.Critical }
             })
-            return False
-
-        self._request_count = 1
 
-        self._features.clear()
-        r = searchStacItems()
+        r = self._setCollectionsCOGBandsMeta()
         if not r['is_ok']:
-            requestProcessData.emit( {
-                'type': 'message_bar',
-                'data':{ 'text': r['message'], 'level': Qgis.Critical }
-            })
+            messageError( r['message'] )
             return False
 
-        #matched = r['matched']
-        returned = r['returned']
-        if not returned:
-            msg = tr("No scenes found in '{}' collection").format( self.collection['id'] )
-            requestProcessData.emit( {
-                'type': 'message_bar',
-                'data':{ 'text': msg, 'level': Qgis.Info }
-            })
-            return True
-
-        self._features = r['features']
-
-        if r['url_next'] is None:
-            messageTotalFeatures( returned )
-            return True
-
-        total_returned = r['returned']
-       
-        while True:
-            self._request_count += 1
-            r = fetchNextPage( r['url_next'] )
-            if not r['is_ok']:
-                requestProcessData.emit( {
-                    'type': 'message_bar',
-                    'data':{ 'text': r['message'], 'level': Qgis.Critical }
-                })
-                return False
-
-            total_returned += r['returned']
-            if not total_returned and r['url_next'] is None:
-                if not total_returned:
+        self._request_count = 0
+        matched = 0
+        if windows is None:
+            self._features.clear()
+            windows = [ ( bbox, dates ) ]
+
+        # First pages of windows are requested concurrently
+        list_args = [ self._searchArgs( window_bbox, window_dates ) for window_bbox, window_dates in windows ]
+        firsts = self._getResults( list_args, self.CACHE_TTL_SEARCH ) if len( windows ) > 1 else [ None ]
+        for ( window_bbox, window_dates ), args, first in zip( windows, list_args, firsts ):
+            spatial_filter = SpatialFilter( window_bbox )
+            window_matched = 0
+
+            # Next page is fetched in background while the current page is processed
+            pages = self._iterPages( args, getNextUrlFromResult, first )
+            try:
+                for r in pages:
+                    self._request_count += 1
+                    if not r['is_ok']:
+                        messageError( r['message'] )
+                        return False
+
+                    page = r['page']
+                    r = processResult( page )
+                    if not r['is_ok']:
+                        messageError( r['message'] )
+                        return False
+
+                    window_matched = r['matched'] if not r['matched'] is None else window_matched + page.total
+                    new_features = { id: values for id, values in r['features'].items() if not id in self._features }
+                    self._features.update( new_features )
+                    if not addFeatures is None and len( new_features ):
+                        addFeatures( new_features )
+
+                    if getNextUrlFromResult( page.result ) is None:
+                        break
+
+                    msg = tr("Footprint filtered: {} of {}").format( len( self._features ), matched + window_matched )
                     requestProcessData.emit( {
                         'type': 'message_bar',
-                        'data':{ 'text': tr('No scenes found'), 'level': Qgis.Info }
+                        'data': { 'text': msg, 'level': Qgis.Info }
                     })
-                return True
-            
-            if r['url_next'] is None:
-                messageTotalFeatures( returned )
-                return True
+            finally:
+                pages.close()
 
-            msg = tr("Footprint filtered: {} of {}").format( total_returned, returned )
+            matched += window_matched
+
+        if not len( self._features ):
+            msg = tr("No scenes found in '{}' collection").format( self.collection['id'] )
             requestProcessData.emit( {
                 'type': 'message_bar',
-                'data': { 'text': msg, 'level': Qgis.Info }
+                'data':{ 'text': msg, 'level': Qgis.Info }
             })
+            return True
+
+        messageTotalFeatures( matched )
+        return True
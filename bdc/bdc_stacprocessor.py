@@ -17,11 +17,14 @@
  ***************************************************************************/
 """
 
+from typing import Callable
+
 from .stacprocessor import (
     QgisInterface, QgsTask,
     StacProcessor,
     TaskProcessor,
-    StacClient
+    StacClient,
+    ThrottledSignal
 )
 
 
@@ -33,6 +36,13 @@ class BDCStacProcessor(StacProcessor):
         ):
         super().__init__( iface, task_processor, stac_client )
 
-    def _search_run(self, task:QgsTask)->bool:
+    def _search_run(self,
+            task:QgsTask,
+            requestProcessData:ThrottledSignal,
+            addFeatures:Callable[[dict], None]
+        )->bool:
         footprint_band = self._client.collection['spatial_res_composite'][ self.spatial_resolution ][0]
-        return self._client.search( self.bbox, self.dates, footprint_band, self.requestProcessData, task.isCanceled )
+        return self._client.search(
+            self.bbox, self.dates, footprint_band, requestProcessData, task.isCanceled,
+            self._search_windows, addFeatures
+        )
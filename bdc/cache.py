@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Cache
+                            Persistent caches (SQLite)
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Union
+
+from qgis.core import QgsMessageLog, Qgis
+
+
+class SqliteCache():
+    """
+    SQLite file shared by the QGIS sessions.
+    One connection is used by all threads, serialized by a lock.
+    """
+    SCHEMA = None # Sub Class
+
+    def __init__(self, filepath:str):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect( filepath, timeout=30, check_same_thread=False )
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript( self.SCHEMA )
+            self._conn.commit()
+
+    def _execute(self, sql:str, params:tuple=())->list:
+        with self._lock:
+            try:
+                rows = self._conn.execute( sql, params ).fetchall()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                msg = f"Cache {self.filepath}: {e}"
+                QgsMessageLog.logMessage( message=msg, tag='BDC Catalog', level=Qgis.Warning )
+                return []
+
+        return rows
+
+    def clear(self)->None:
+        with self._lock:
+            for table in self._tables():
+                self._conn.execute( f"DELETE FROM {table}" )
+            self._conn.commit()
+
+    def _tables(self)->list:
+        rows = self._conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+        return [ row[0] for row in rows ]
+
+    def close(self)->None:
+        with self._lock:
+            self._conn.close()
+
+
+class MemoryLRU():
+    """
+    Memory of the entries read or written by a cache, the least recently used are evicted above 'max_items'
+    """
+    def __init__(self, max_items:int=10000):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key:str):
+        with self._lock:
+            if not key in self._items:
+                return None
+            self._items.move_to_end( key )
+            return self._items[ key ]
+
+    def put(self, key:str, value)->None:
+        with self._lock:
+            self._items[ key ] = value
+            self._items.move_to_end( key )
+            while len( self._items ) > self.max_items:
+                self._items.popitem( last=False )
+
+
+class CachedResponse():
+    """
+    Response served from the cache, with the part of requests.Response used by the clients
+    """
+    def __init__(self, content:bytes, url:str, stored:float):
+        self.status_code = 200
+        self.content = content
+        self.url = url
+        self.stored = stored
+        self.headers = {}
+        self.from_cache = True
+
+    @property
+    def text(self)->str:
+        return self.content.decode('utf-8')
+
+    def json(self)->dict:
+        return json.loads( self.content )
+
+    def close(self)->None:
+        pass
+
+
+class HttpCache(SqliteCache):
+    """
+    Cache of HTTP responses keyed by method, URL, params and body.
+    Entries older than TTL are revalidated with ETag/Last-Modified,
+    the least recently used entries are evicted above 'max_size' bytes.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS http_cache (
+            key TEXT PRIMARY KEY,
+            url TEXT,
+            body BLOB,
+            etag TEXT,
+            last_modified TEXT,
+            stored REAL,
+            accessed REAL,
+            size INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS http_cache_accessed ON http_cache(accessed);
+    """
+    def __init__(self, filepath:str, max_size:int=200*1024*1024):
+        super().__init__( filepath )
+        self.max_size = max_size
+
+    @staticmethod
+    def key(args:dict)->str:
+        key = {
+            'method': args.get( 'method', 'GET' ).upper(),
+            'url': args['url'],
+            'params': args.get('params'),
+            'json': args.get('json')
+        }
+        return json.dumps( key, sort_keys=True )
+
+    def get(self, key:str)->Union[dict, None]:
+        rows = self._execute(
+            'SELECT url, body, etag, last_modified, stored FROM http_cache WHERE key = ?', ( key, )
+        )
+        if not len( rows ):
+            return None
+
+        self._execute('UPDATE http_cache SET accessed = ? WHERE key = ?', ( time.time(), key ) )
+        ( url, body, etag, last_modified, stored ) = rows[0]
+        return {
+            'url': url,
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored': stored
+        }
+
+    def isFresh(self, entry:dict, ttl:float)->bool:
+        return ( time.time() - entry['stored'] ) < ttl
+
+    def conditionalHeaders(self, entry:dict)->dict:
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        return headers
+
+    def put(self, key:str, url:str, content:bytes, headers:dict)->None:
+        now = time.time()
+        self._execute(
+            'INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                key, url, sqlite3.Binary( content ),
+                headers.get('ETag'), headers.get('Last-Modified'),
+                now, now, len( content )
+            )
+        )
+        self.evict()
+
+    def touch(self, key:str)->None:
+        # Revalidated (304 Not Modified)
+        now = time.time()
+        self._execute('UPDATE http_cache SET stored = ?, accessed = ? WHERE key = ?', ( now, now, key ) )
+
+    def evict(self)->None:
+        rows = self._execute('SELECT COALESCE(SUM(size), 0) FROM http_cache')
+        total = rows[0][0] if len( rows ) else 0
+        if total <= self.max_size:
+            return
+
+        rows = self._execute('SELECT key, size FROM http_cache ORDER BY accessed ASC')
+        keys = []
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            keys.append( ( key, ) )
+            total -= size
+        with self._lock:
+            self._conn.executemany('DELETE FROM http_cache WHERE key = ?', keys )
+            self._conn.commit()
+
+
+class FootprintCache(SqliteCache):
+    """
+    CRS (authority code) and footprint (GeoJSON, EPSG:4326) of a published COG, keyed by href.
+    A published COG does not change, so the entries do not expire.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS footprint_cache (
+            href TEXT PRIMARY KEY,
+            crs TEXT,
+            geometry TEXT
+        );
+    """
+    def __init__(self, filepath:str, max_memory_items:int=10000):
+        super().__init__( filepath )
+        self._memory = MemoryLRU( max_memory_items )
+
+    def get(self, href:str)->Union[dict, None]:
+        entry = self._memory.get( href )
+        if not entry is None:
+            return entry
+
+        rows = self._execute('SELECT crs, geometry FROM footprint_cache WHERE href = ?', ( href, ) )
+        if not len( rows ):
+            return None
+
+        ( crs, geometry ) = rows[0]
+        entry = {
+            'crs': crs,
+            'geometry': None if geometry is None else json.loads( geometry )
+        }
+        self._memory.put( href, entry )
+
+        return entry
+
+    def put(self, href:str, crs:str, geometry:Union[dict, None])->None:
+        entry = { 'crs': crs, 'geometry': geometry }
+        self._memory.put( href, entry )
+        self._execute(
+            'INSERT OR REPLACE INTO footprint_cache VALUES (?, ?, ?)',
+            ( href, crs, None if geometry is None else json.dumps( geometry ) )
+        )
+
+
+class RasterMetaCache(SqliteCache):
+    """
+    Raster metadata of a COG (see vrtwriter: size, geotransform, SRS, data type, nodata, block, overviews),
+    keyed by href. Populated by the search (STAC or probe of footprint) and used by the VRT building,
+    so a COG is opened at most once. Only the probed metadata is persisted (the STAC one is free),
+    a STAC entry evicted from memory is probed again by the VRT building.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS raster_meta_cache (
+            href TEXT PRIMARY KEY,
+            meta TEXT
+        );
+    """
+    def __init__(self, filepath:str=':memory:', max_memory_items:int=20000):
+        super().__init__( filepath )
+        self._memory = MemoryLRU( max_memory_items )
+
+    def get(self, href:str)->Union[dict, None]:
+        meta = self._memory.get( href )
+        if not meta is None:
+            return meta
+
+        rows = self._execute('SELECT meta FROM raster_meta_cache WHERE href = ?', ( href, ) )
+        if not len( rows ):
+            return None
+
+        meta = json.loads( rows[0][0] )
+        self._memory.put( href, meta )
+
+        return meta
+
+    def put(self, href:str, meta:dict, persist:bool=True)->None:
+        self._memory.put( href, meta )
+        if persist:
+            self._execute(
+                'INSERT OR REPLACE INTO raster_meta_cache VALUES (?, ?)',
+                ( href, json.dumps( meta ) )
+            )
@@ -41,6 +41,7 @@ class Catalog(QObject):
 
         self.widget.requestProcessData.connect( self.process )
         self.widget.cancelProcess.connect( self.processor.cancelCurrentTask )
+        self.widget.requestMaterialize.connect( self.processor.materializeSelectedMosaics )
 
         self.processor.finished.connect( self.widget.finished )
         self.processor.task_processor.messageStatus.connect( self.widget.messageStatus )
@@ -49,6 +50,7 @@ class Catalog(QObject):
         self.iface.mainWindow().statusBar().removeWidget( self.widget )
 
         self.widget.requestProcessData.disconnect( self.process )
+        self.widget.requestMaterialize.disconnect( self.processor.materializeSelectedMosaics )
         self.processor.finished.disconnect( self.widget.finished )
         self.processor.task_processor.messageStatus.disconnect( self.widget.messageStatus )
 
@@ -62,6 +64,7 @@ class Catalog(QObject):
         self.processor.dates = [ values['ini_date'], values['end_date'] ]
         self.processor.dir_mosaic = os.path.normpath( values['vrt_dir'] )
         self.processor.bbox = values['bbox']
+        self.processor.footprint_driver = values['footprint_driver']
 
         self.processor.process()
 
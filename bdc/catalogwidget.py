@@ -49,6 +49,7 @@ from qgis.core import (
 from qgis.gui import QgsHighlight
 
 from .translate import tr
+from .footprintwriter import FootprintWriter
 
 
 class HighlightManager:
@@ -153,6 +154,7 @@ class ToolButtonExtent(QToolButton):
 class CatalogWidget(QWidget):
     requestProcessData = pyqtSignal(dict)
     cancelProcess = pyqtSignal()
+    requestMaterialize = pyqtSignal()
     def __init__(self,
             iface:QgisInterface,
             config_collection:dict,
@@ -229,6 +231,16 @@ class CatalogWidget(QWidget):
 
             return cb_collection, cb_spatial_resolution
 
+        def createFootprintDriverComboBox()->QComboBox:
+            cb = QComboBox(self)
+            cb.setToolTip( tr('Select the format of footprint file') )
+            cb.addItems( list( FootprintWriter.EXTENSIONS.keys() ) )
+            cb.setCurrentText( self.setting.value( self.setting_key_footprint_driver, 'GeoJSON', type=str ) )
+            cb.setSizeAdjustPolicy(QComboBox.AdjustToContents)
+            cb.currentTextChanged.connect( lambda driver: self.setting.setValue( self.setting_key_footprint_driver, driver ) )
+
+            return cb
+
         def createDatesWidgets():
             dt_ini = QDateEdit(QDate.currentDate().addDays(-7), self)
             dt_ini.setToolTip( tr('Select start date') )
@@ -251,7 +263,9 @@ class CatalogWidget(QWidget):
             lyt.addWidget( self.dt_ini )
             lyt.addWidget( self.dt_end )
             lyt.addWidget( self.btn_folder )
+            lyt.addWidget( self.cbx_footprint_driver )
             lyt.addWidget( self.btn_extent )
+            lyt.addWidget( self.btn_materialize )
 
             return widget
 
@@ -274,6 +288,7 @@ class CatalogWidget(QWidget):
         self.config_collection = config_collection
 
         self.setting_key_vrt_dir = f"{setting_key}/vrt_dir"
+        self.setting_key_footprint_driver = f"{setting_key}/footprint_driver" # GeoJSON, GPKG or FlatGeobuf
         self._toggle_button_run = {
             True: {
                 'icon': QgsApplication.getThemeIcon('mTaskRunning.svg'),
@@ -302,6 +317,8 @@ class CatalogWidget(QWidget):
 
         ( self.dt_ini, self.dt_end ) = createDatesWidgets()
 
+        self.cbx_footprint_driver = createFootprintDriverComboBox()
+
         self.btn_folder = createButton(
             QgsApplication.getThemeIcon('mIconFolderOpen.svg'),
             self._title_folder,
@@ -313,6 +330,12 @@ class CatalogWidget(QWidget):
         
         self.btn_extent = createButtonExtent()
 
+        self.btn_materialize = createButton(
+            QgsApplication.getThemeIcon('mActionFileSave.svg'),
+            tr('Materialize the selected mosaics to local COG (background)'),
+            self.on_Materialize
+        )
+
         # --- View 1 ---
         self.controls = createControls()
 
@@ -345,6 +368,8 @@ class CatalogWidget(QWidget):
         self.btn_toggle.setToolTip( status['tooltip'] )
         
         self.stack.setCurrentIndex( status['stack_index'] )
+        # Only one task: the mosaic VRTs are not rebuilt while materialized
+        self.btn_materialize.setEnabled( is_run )
 
     @pyqtSlot(str)
     def on_UpdateItemsSpatialResolution(self, collection:str)->None:
@@ -386,7 +411,8 @@ class CatalogWidget(QWidget):
                 'ini_date': self.dt_ini.date().toString( fmt_date ),
                 'end_date': self.dt_end.date().toString( fmt_date ),
                 'bbox': self._bbox,
-                'vrt_dir': self.btn_folder.toolTip()
+                'vrt_dir': self.btn_folder.toolTip(),
+                'footprint_driver': self.cbx_footprint_driver.currentText()
             }
 
         def checkValues()->dict:
@@ -416,6 +442,13 @@ class CatalogWidget(QWidget):
             self.btn_toggle.setEnabled(False)
             return
 
+    @pyqtSlot()
+    def on_Materialize(self)->None:
+        # Cancelled by the toggle button, as the search
+        self.iface.messageBar().clearWidgets()
+        self._toggleButton(False)
+        self.requestMaterialize.emit()
+
     @pyqtSlot()
     def finished(self)->None:
         self.btn_toggle.setEnabled(True)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ COG Header
+                            CRS from the header of (Big)TIFF, without GDAL
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import struct
+from typing import Union
+
+
+TAG_GEO_KEY_DIRECTORY = 34735
+KEY_GEOGRAPHIC_TYPE = 2048
+KEY_PROJECTED_CS_TYPE = 3072
+USER_DEFINED = 32767
+
+# TIFF type: ( struct format, size )
+TYPES = {
+    3: ( 'H', 2 ), # SHORT
+    4: ( 'I', 4 ), # LONG
+    16: ( 'Q', 8 ) # LONG8 (BigTIFF)
+}
+
+
+def crsFromItem(item:dict, asset:str=None)->Union[str, None]:
+    """
+    EPSG code from the projection extension of STAC ('proj:epsg' or 'proj:code'), asset has priority
+    """
+    sources = [ item.get( 'properties', {} ) ]
+    if not asset is None and asset in item.get( 'assets', {} ):
+        sources.insert( 0, item['assets'][ asset ] )
+
+    for source in sources:
+        if not source.get('proj:epsg') is None:
+            return str( source['proj:epsg'] )
+        code = source.get('proj:code')
+        if isinstance( code, str ) and code.upper().startswith('EPSG:'):
+            return code.split(':')[1]
+
+    return None
+
+
+def crsFromTiffHeader(data:bytes)->Union[str, None]:
+    """
+    EPSG code from the GeoKeys of first IFD.
+    None when the header is not TIFF, the GeoKeys are outside of data or the CRS is user defined.
+    """
+    if len( data ) < 16 or not data[:2] in ( b'II', b'MM' ):
+        return None
+
+    order = '<' if data[:2] == b'II' else '>'
+    ( magic, ) = struct.unpack_from( f"{order}H", data, 2 )
+    if magic == 42:
+        ( ifd_offset, ) = struct.unpack_from( f"{order}I", data, 4 )
+        ( count_format, count_size, entry_size ) = ( 'H', 2, 12 )
+        ( offset_format, offset_size ) = ( 'I', 4 )
+    elif magic == 43:
+        ( ifd_offset, ) = struct.unpack_from( f"{order}Q", data, 8 )
+        ( count_format, count_size, entry_size ) = ( 'Q', 8, 20 )
+        ( offset_format, offset_size ) = ( 'Q', 8 )
+    else:
+        return None
+
+    if ifd_offset + count_size > len( data ):
+        return None
+
+    ( total, ) = struct.unpack_from( f"{order}{count_format}", data, ifd_offset )
+    geo_keys = None
+    for idx in range( total ):
+        entry = ifd_offset + count_size + idx * entry_size
+        if entry + entry_size > len( data ):
+            return None
+
+        ( tag, type_ ) = struct.unpack_from( f"{order}HH", data, entry )
+        if not tag == TAG_GEO_KEY_DIRECTORY or not type_ in TYPES:
+            continue
+
+        ( count, ) = struct.unpack_from( f"{order}{offset_format}", data, entry + 4 )
+        ( value_format, value_size ) = TYPES[ type_ ]
+        value_pos = entry + 4 + offset_size
+        if count * value_size > offset_size:
+            ( value_pos, ) = struct.unpack_from( f"{order}{offset_format}", data, value_pos )
+        if value_pos + count * value_size > len( data ):
+            return None
+        geo_keys = struct.unpack_from( f"{order}{count}{value_format}", data, value_pos )
+        break
+
+    if geo_keys is None or len( geo_keys ) < 4:
+        return None
+
+    # Header: version, revision, minor, number of keys; Key: id, location, count, value
+    keys = {}
+    for idx in range( geo_keys[3] ):
+        pos = 4 + idx * 4
+        if pos + 4 > len( geo_keys ):
+            break
+        ( key_id, location, _, value ) = geo_keys[ pos:pos + 4 ]
+        if location == 0:
+            keys[ key_id ] = value
+
+    for key_id in ( KEY_PROJECTED_CS_TYPE, KEY_GEOGRAPHIC_TYPE ):
+        value = keys.get( key_id )
+        if not value is None and 0 < value < USER_DEFINED:
+            return str( value )
+
+    return None
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ COG Materializer
+                            Local COG of mosaic VRT (remote COGs)
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Union
+
+from osgeo import gdal
+
+from .translate import tr
+
+
+CHUNK_SIZE = 2048 # Pixels of side of window, multiple of BLOCK_SIZE
+BLOCK_SIZE = 512
+COMPRESS = 'DEFLATE'
+
+
+def cogFilepath(vrt_path:str)->str:
+    return f"{os.path.splitext( vrt_path )[0]}.tif"
+
+
+def _windows(xsize:int, ysize:int, chunk:int)->List[tuple]:
+    return [
+        ( xoff, yoff, min( chunk, xsize - xoff ), min( chunk, ysize - yoff ) )
+        for yoff in range( 0, ysize, chunk )
+        for xoff in range( 0, xsize, chunk )
+    ]
+
+
+def _signature(vrt_path:str, ds:gdal.Dataset)->dict:
+    # A mosaic VRT rebuilt (new scenes) has a new modification time
+    return {
+        'mtime': os.path.getmtime( vrt_path ),
+        'xsize': ds.RasterXSize, 'ysize': ds.RasterYSize,
+        'bands': ds.RasterCount,
+        'geotransform': list( ds.GetGeoTransform() )
+    }
+
+
+def _loadState(filepath:str)->Union[dict, None]:
+    if not os.path.exists( filepath ):
+        return None
+    try:
+        with open( filepath, encoding='utf-8' ) as f:
+            return json.load( f )
+    except ( OSError, ValueError ):
+        return None
+
+
+def _saveState(filepath:str, state:dict)->None:
+    filepath_tmp = f"{filepath}.tmp"
+    with open( filepath_tmp, 'w', encoding='utf-8' ) as f:
+        json.dump( state, f )
+    os.replace( filepath_tmp, filepath )
+
+
+def _createPart(filepath:str, src:gdal.Dataset)->gdal.Dataset:
+    band = src.GetRasterBand(1)
+    options = [
+        'TILED=YES', f"BLOCKXSIZE={BLOCK_SIZE}", f"BLOCKYSIZE={BLOCK_SIZE}",
+        f"COMPRESS={COMPRESS}", 'BIGTIFF=IF_SAFER'
+    ]
+    ds = gdal.GetDriverByName('GTiff').Create(
+        filepath, src.RasterXSize, src.RasterYSize, src.RasterCount, band.DataType, options=options
+    )
+    ds.SetGeoTransform( src.GetGeoTransform() )
+    ds.SetProjection( src.GetProjection() )
+    for idx in range( src.RasterCount ):
+        src_band = src.GetRasterBand( idx + 1 )
+        dst_band = ds.GetRasterBand( idx + 1 )
+        dst_band.SetDescription( src_band.GetDescription() )
+        if not src_band.GetNoDataValue() is None:
+            dst_band.SetNoDataValue( src_band.GetNoDataValue() )
+
+    return ds
+
+
+def materializeCOG(
+        vrt_path:str,
+        isCanceled:Callable[[], bool],
+        setProgress:Callable[[float], None],
+        workers:int=4,
+        chunk:int=CHUNK_SIZE
+    )->dict:
+    """
+    The VRT is copied by windows to a tiled GeoTIFF (part), the windows are read by concurrent workers
+    (one dataset by worker), the windows written are kept in the state file, so a cancelled or interrupted
+    copy is resumed. Then the COG (internal overviews) is created from the part.
+    Return { 'is_ok': True, 'filepath' } or { 'is_ok': False, 'message' }.
+    setProgress: percent (0-100).
+    """
+    def copyWindow(idx:int, window:tuple)->bool:
+        # Run in worker thread
+        if isCanceled():
+            return False
+
+        if not hasattr( local, 'src' ):
+            local.src = gdal.Open( vrt_path )
+            with lock:
+                sources.append( local.src )
+        data = local.src.ReadRaster( *window )
+        with lock:
+            dst.WriteRaster( *window, data )
+
+        return True
+
+    def callbackCOG(complete:float, message:str, user_data:None)->int:
+        setProgress( 90 + complete * 10 )
+        return 0 if isCanceled() else 1
+
+    cog_path = cogFilepath( vrt_path )
+    part_path = f"{cog_path}.part.tif"
+    state_path = f"{cog_path}.part.json"
+    if os.path.exists( cog_path ) and not os.path.exists( state_path ) and os.path.getmtime( cog_path ) > os.path.getmtime( vrt_path ):
+        setProgress( 100 )
+        return { 'is_ok': True, 'filepath': cog_path }
+
+    try:
+        src = gdal.Open( vrt_path )
+        signature = _signature( vrt_path, src )
+        state = _loadState( state_path )
+        if state is None or not state['source'] == signature or not os.path.exists( part_path ):
+            state = { 'source': signature, 'done': [] }
+            dst = _createPart( part_path, src )
+            _saveState( state_path, state )
+        else:
+            dst = gdal.Open( part_path, gdal.GA_Update )
+        src = None
+    except RuntimeError as e:
+        return { 'is_ok': False, 'message': str( e ) }
+
+    windows = _windows( signature['xsize'], signature['ysize'], chunk )
+    done = set( state['done'] )
+    local = threading.local()
+    lock = threading.Lock()
+    sources = []
+    executor = ThreadPoolExecutor( max_workers=workers )
+    try:
+        futures = [
+            ( idx, executor.submit( copyWindow, idx, window ) )
+            for idx, window in enumerate( windows ) if not idx in done
+        ]
+        for idx, future in futures:
+            if not future.result():
+                break
+            done.add( idx )
+            if len( done ) % workers == 0 or len( done ) == len( windows ):
+                with lock:
+                    dst.FlushCache() # Windows in the file before the state
+                state['done'] = sorted( done )
+                _saveState( state_path, state )
+            setProgress( len( done ) / len( windows ) * 90 )
+    except RuntimeError as e:
+        return { 'is_ok': False, 'message': str( e ) }
+    finally:
+        executor.shutdown( wait=True, cancel_futures=True )
+        sources.clear()
+        dst = None
+        state['done'] = sorted( done )
+        _saveState( state_path, state )
+
+    if not len( done ) == len( windows ):
+        msg = tr('Materialization cancelled, {} of {} windows kept to resume').format( len( done ), len( windows ) )
+        return { 'is_ok': False, 'message': msg }
+
+    if not os.path.getmtime( vrt_path ) == signature['mtime']:
+        # Mosaic VRT rebuilt while copied: the part is discarded
+        for filepath in ( part_path, state_path ):
+            os.remove( filepath )
+        return { 'is_ok': False, 'message': tr('Mosaic VRT changed during the materialization, request it again') }
+
+    cog_path_tmp = f"{cog_path}.tmp.tif"
+    options = [ f"COMPRESS={COMPRESS}", 'PREDICTOR=YES', f"NUM_THREADS={workers}", 'BIGTIFF=IF_SAFER', 'OVERVIEWS=AUTO' ]
+    try:
+        ds = gdal.Translate( cog_path_tmp, part_path, format='COG', creationOptions=options, callback=callbackCOG )
+        ds = None
+    except RuntimeError as e:
+        if os.path.exists( cog_path_tmp ):
+            os.remove( cog_path_tmp )
+        msg = tr('Materialization cancelled, windows kept to resume') if isCanceled() else str( e )
+        return { 'is_ok': False, 'message': msg }
+
+    os.replace( cog_path_tmp, cog_path )
+    for filepath in ( part_path, state_path ):
+        os.remove( filepath )
+    setProgress( 100 )
+
+    return { 'is_ok': True, 'filepath': cog_path }
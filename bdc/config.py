@@ -20,6 +20,8 @@
 
 import os, json
 
+from qgis.core import QgsApplication
+
 from .translate import tr
 
 def configCollection()->dict:
@@ -38,4 +40,10 @@ def configCollection()->dict:
         msg = tr("Error: JSON file ('{}') - {}").format(filepath, e)
         raise ValueError(msg)
 
-    return collection
\ No newline at end of file
+    return collection
+
+def cacheFilepath(filename:str)->str:
+    cache_dir = os.path.join( QgsApplication.qgisSettingsDirPath(), 'cache', 'bdc_catalog' )
+    os.makedirs( cache_dir, exist_ok=True )
+
+    return os.path.join( cache_dir, filename )
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Feature Store
+                            Compact store of the items of search
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import json
+import sys
+from collections.abc import MutableMapping
+from typing import Iterator, Tuple, Union
+
+from osgeo import ogr
+
+
+class FeatureRecord():
+    """
+    Item of search: geometry as WKB with its envelope ( min_x, min_y, max_x, max_y ),
+    bands as ( ( band, href, spatial_res ), ... ).
+    The strings repeated between items are interned.
+    """
+    __slots__ = ( 'datetime', 'created', 'orbit_crs', 'wkb', 'envelope', 'bands' )
+
+    def __init__(self, datetime:str, created:str, orbit_crs:str, wkb:bytes, envelope:tuple, bands:tuple):
+        self.datetime = datetime
+        self.created = created
+        self.orbit_crs = orbit_crs
+        self.wkb = wkb
+        self.envelope = envelope
+        self.bands = bands
+
+    @property
+    def date(self)->str:
+        return self.datetime.split('T')[0]
+
+
+class FeatureStore(MutableMapping):
+    """
+    Mapping id -> { 'geometry', 'properties', 'bands' } (same dict of StacClient._getIdItems),
+    the dict is created when requested, the items are kept as FeatureRecord.
+    The spatial resolution is kept by band of item (interned): the same band name has other
+    resolution in other collection (e.g. BAND13 of CBERS-4 and CBERS-4A WFI).
+    The index of scenes ( date_orbit_crs -> ids ) is maintained when items are added or removed,
+    the scenes by spatial resolution are kept until the store changes.
+    """
+    def __init__(self, key_spatial_res:str, key_orbit_crs:str):
+        self._key_spatial_res = key_spatial_res
+        self._key_orbit_crs = key_orbit_crs
+        self._records = {}
+        self._scenes_ids = {} # scene_key -> { id: None }, ordered by insertion
+        self._scenes_by_res = {} # spatial_resolution -> scenes
+
+    @staticmethod
+    def sceneKey(record:'FeatureRecord')->str:
+        return f"{record.date}_{record.orbit_crs}"
+
+    @staticmethod
+    def toWKB(json_geom:Union[dict, None])->Tuple[Union[bytes, None], Union[tuple, None]]:
+        """
+        WKB and envelope ( min_x, min_y, max_x, max_y ), the envelope is None for an empty geometry
+        """
+        # Null geometry is allowed by STAC
+        if json_geom is None:
+            return ( None, None )
+        geom = ogr.CreateGeometryFromJson( json.dumps( json_geom ) )
+        if geom.IsEmpty():
+            return ( bytes( geom.ExportToIsoWkb() ), None )
+        ( min_x, max_x, min_y, max_y ) = geom.GetEnvelope()
+        return ( bytes( geom.ExportToIsoWkb() ), ( min_x, min_y, max_x, max_y ) )
+
+    @staticmethod
+    def toGeoJSON(wkb:Union[bytes, None])->Union[dict, None]:
+        if wkb is None:
+            return None
+        return json.loads( ogr.CreateGeometryFromWkb( wkb ).ExportToJson() )
+
+    def _record(self, values:dict)->FeatureRecord:
+        p = values['properties']
+        bands = tuple(
+            ( sys.intern( band ), value['href'], sys.intern( value[ self._key_spatial_res ] ) )
+            for band, value in values['bands'].items()
+        )
+        ( wkb, envelope ) = self.toWKB( values['geometry'] )
+
+        return FeatureRecord(
+            p['datetime'],
+            p['created'],
+            sys.intern( p[ self._key_orbit_crs ] ),
+            wkb,
+            envelope,
+            bands
+        )
+
+    def _values(self, record:FeatureRecord)->dict:
+        return {
+            'geometry': self.toGeoJSON( record.wkb ),
+            'properties': {
+                'datetime': record.datetime,
+                'created': record.created,
+                self._key_orbit_crs: record.orbit_crs
+            },
+            'bands': {
+                band: {
+                    'href': href,
+                    self._key_spatial_res: spatial_res
+                } for band, href, spatial_res in record.bands
+            }
+        }
+
+    def __getitem__(self, id:str)->dict:
+        return self._values( self._records[ id ] )
+
+    def __setitem__(self, id:str, values:dict)->None:
+        if id in self._records:
+            del self[ id ]
+
+        record = self._record( values )
+        self._records[ id ] = record
+        self._scenes_ids.setdefault( self.sceneKey( record ), {} )[ id ] = None
+        self._scenes_by_res.clear()
+
+    def __delitem__(self, id:str)->None:
+        record = self._records.pop( id )
+        key = self.sceneKey( record )
+        del self._scenes_ids[ key ][ id ]
+        if not len( self._scenes_ids[ key ] ):
+            del self._scenes_ids[ key ]
+        self._scenes_by_res.clear()
+
+    def __iter__(self)->Iterator[str]:
+        return iter( self._records )
+
+    def __len__(self)->int:
+        return len( self._records )
+
+    def __contains__(self, id:str)->bool:
+        return id in self._records
+
+    def clear(self)->None:
+        self._records.clear()
+        self._scenes_ids.clear()
+        self._scenes_by_res.clear()
+
+    def records(self)->Iterator[Tuple[str, FeatureRecord]]:
+        """
+        Items without create the dict (and decode the geometry), see SpatialFilter.intersectsRecord
+        """
+        return iter( self._records.items() )
+
+    def hrefs(self, record:FeatureRecord, spatial_resolution:str)->dict:
+        return {
+            band: href for band, href, spatial_res in record.bands
+            if spatial_res == spatial_resolution
+        }
+
+    def scenes(self, spatial_resolution:str)->dict:
+        """
+        { date_orbit_crs: [ { id: { band: href } } ] } with the bands of spatial resolution
+        """
+        if spatial_resolution in self._scenes_by_res:
+            return self._scenes_by_res[ spatial_resolution ]
+
+        scenes = {
+            key: [ { id: self.hrefs( self._records[ id ], spatial_resolution ) } for id in ids ]
+            for key, ids in self._scenes_ids.items()
+        }
+        self._scenes_by_res[ spatial_resolution ] = scenes
+
+        return scenes
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Footprint Engine
+                            Footprint of scene from COG
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import json
+import time
+from typing import List, Union
+
+from osgeo import gdal, ogr, osr
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .vsicurl_open import openUrl, networkProfile, networkStats
+
+
+MIN_OVERVIEW_SIZE = 256 # Pixels of the largest side of overview read by footprintNumpy
+
+
+def isNumpyAvailable()->bool:
+    return not np is None
+
+
+def footprintGDAL(ds:gdal.Dataset)->dict:
+    """
+    gdal.Footprint of the middle overview, return the first polygon (GeoJSON)
+    """
+    band = ds.GetRasterBand(1)
+    overview = int(band.GetOverviewCount() / 2)
+    if band.GetNoDataValue() is None:
+        band.SetNoDataValue( 0.0 )
+
+    (_, res_x, _, _, _, res_y) = ds.GetGeoTransform()
+    mean_res = ( res_x + -1*res_y ) / 2
+    mean_size = ( ds.RasterXSize + ds.RasterXSize ) / 2
+    factor = mean_res * mean_size / 100
+    factor /= 1120000 # meter->degree
+
+    wkt = gdal.Footprint(
+        None, ds,
+        format='WKT', dstSRS="EPSG:4326",
+        bands=[1], ovr=overview,
+        simplify=factor, maxPoints=4, minRingArea=factor**2/2
+    )
+    # Return  Multpolygon
+    geom = ogr.CreateGeometryFromWkt( wkt )
+    geom_ = geom.GetGeometryRef(0)
+    json_geom = geom_.ExportToJson()
+
+    return json.loads( json_geom )
+
+
+def footprintNumpy(ds:gdal.Dataset, min_size:int=MIN_OVERVIEW_SIZE)->Union[dict, None]:
+    """
+    Read once the smallest overview (of mask when the COG has internal mask) with at least 'min_size',
+    or the largest overview when all are smaller. Without overviews, the full resolution is read
+    decimated to 'min_size' (the blocks of COG are still requested).
+    The boundary of valid pixels is the span (first and last valid column) of each row:
+    the outline is a staircase of overview pixels (simplified by one pixel), the holes and the
+    concavities between valid pixels of a row are filled.
+    Return polygon (GeoJSON) in EPSG:4326, None when the scene has no valid pixel.
+    """
+    band = ds.GetRasterBand(1)
+    is_mask = bool( band.GetMaskFlags() & gdal.GMF_PER_DATASET )
+    source = band.GetMaskBand() if is_mask else band
+
+    overviews = [ source.GetOverview( idx ) for idx in range( source.GetOverviewCount() ) ]
+    levels = [ overview for overview in overviews if max( overview.XSize, overview.YSize ) >= min_size ]
+    if len( levels ):
+        level = min( levels, key=lambda overview: overview.XSize * overview.YSize )
+    elif len( overviews ):
+        level = max( overviews, key=lambda overview: overview.XSize * overview.YSize )
+    else:
+        level = None
+
+    if level is None:
+        factor = max( 1.0, max( source.XSize, source.YSize ) / min_size )
+        ( level_xsize, level_ysize ) = ( max( 1, int( source.XSize / factor ) ), max( 1, int( source.YSize / factor ) ) )
+        arr = source.ReadAsArray( buf_xsize=level_xsize, buf_ysize=level_ysize )
+    else:
+        ( level_xsize, level_ysize ) = ( level.XSize, level.YSize )
+        arr = level.ReadAsArray()
+    if is_mask:
+        valid = arr > 0
+    else:
+        nodata = band.GetNoDataValue()
+        valid = arr != ( 0 if nodata is None else nodata )
+        if np.issubdtype( arr.dtype, np.floating ):
+            valid &= ~np.isnan( arr )
+
+    rows = np.flatnonzero( valid.any( axis=1 ) )
+    if not len( rows ):
+        return None
+
+    spans = valid[ rows ]
+    left = spans.argmax( axis=1 )
+    right = spans.shape[1] - spans[ :, ::-1 ].argmax( axis=1 ) # Edge after last valid pixel
+
+    # Ring in pixels of overview: left side downward, right side upward
+    px = np.concatenate( ( np.repeat( left, 2 ), np.repeat( right[::-1], 2 ), left[:1] ) )
+    py = np.concatenate( ( np.stack( ( rows, rows + 1 ), axis=1 ).ravel(), np.stack( ( rows[::-1] + 1, rows[::-1] ), axis=1 ).ravel(), rows[:1] ) )
+
+    # Pixel of overview -> georeferenced
+    gt = ds.GetGeoTransform()
+    scale_x = ds.RasterXSize / level_xsize
+    scale_y = ds.RasterYSize / level_ysize
+    xs = gt[0] + px * scale_x * gt[1] + py * scale_y * gt[2]
+    ys = gt[3] + px * scale_x * gt[4] + py * scale_y * gt[5]
+
+    ring = ogr.Geometry( ogr.wkbLinearRing )
+    for x, y in zip( xs.tolist(), ys.tolist() ):
+        ring.AddPoint_2D( x, y )
+    geom = ogr.Geometry( ogr.wkbPolygon )
+    geom.AddGeometry( ring )
+    # Tolerance of one pixel of overview
+    geom = geom.SimplifyPreserveTopology( max( abs( gt[1] ) * scale_x, abs( gt[5] ) * scale_y ) )
+
+    sr = ds.GetSpatialRef()
+    sr4326 = osr.SpatialReference()
+    sr4326.ImportFromEPSG( 4326 )
+    for s in ( sr, sr4326 ):
+        s.SetAxisMappingStrategy( osr.OAMS_TRADITIONAL_GIS_ORDER )
+    geom.Transform( osr.CoordinateTransformation( sr, sr4326 ) )
+
+    return json.loads( geom.ExportToJson() )
+
+
+def footprint(ds:gdal.Dataset, engine:str='numpy')->Union[dict, None]:
+    """
+    engine: 'numpy' (footprintNumpy, when available) or 'gdal' (footprintGDAL)
+    """
+    if engine == 'numpy' and isNumpyAvailable():
+        return footprintNumpy( ds )
+
+    return footprintGDAL( ds )
+
+
+def benchmark(urls:List[str], engines:List[str]=( 'gdal', 'numpy' ))->dict:
+    """
+    Mean by item of time (seconds), HTTP requests and bytes read of each engine.
+    The cache of /vsicurl/ is cleared before each item (open + footprint).
+    Usage (QGIS Python console): benchmark( [ href, ... ] ), the FOOTPRINT_ENGINE of
+    BDCStacClient is chosen from its results (no measure is recorded with the plugin).
+    """
+    totals = { engine: { 'items': 0, 'seconds': 0.0, 'requests': 0, 'bytes': 0 } for engine in engines }
+    with networkProfile( stats=True ):
+        for url in urls:
+            for engine in engines:
+                gdal.VSICurlClearCache()
+                if hasattr( gdal, 'NetworkStatsReset' ):
+                    gdal.NetworkStatsReset()
+
+                start = time.perf_counter()
+                r = openUrl( url )
+                if not r['is_ok'] or r['dataset'] is None:
+                    continue
+                footprint( r['dataset'], engine )
+                r['dataset'] = None
+                seconds = time.perf_counter() - start
+
+                stats = networkStats()
+                total = totals[ engine ]
+                total['items'] += 1
+                total['seconds'] += seconds
+                total['requests'] += stats.get( 'requests', 0 )
+                total['bytes'] += stats.get( 'downloaded_bytes', 0 )
+
+    return {
+        engine: {
+            key: value / max( total['items'], 1 ) if not key == 'items' else value
+            for key, value in total.items()
+        } for engine, total in totals.items()
+    }
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Footprint Writer
+                            Footprint layer written as pages arrive
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import json
+import os
+from typing import Callable, List
+
+from osgeo import ogr
+
+from qgis.PyQt.QtCore import Qt, QMetaType, QDateTime
+
+from qgis.core import (
+    QgsVectorFileWriter,
+    QgsFeature, QgsFields, QgsField,
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransformContext,
+    QgsJsonUtils,
+    QgsWkbTypes
+)
+
+
+class FootprintWriter():
+    """
+    Append the features of each processed page to the footprint file.
+    The file is created with the first page, as MultiPolygon (footprints can be Polygon or MultiPolygon).
+    Drivers:
+        GeoJSON: 'properties' and 'bands' as JSON strings
+        GPKG, FlatGeobuf: typed columns (datetime, created, orbit, crs, href_<band>)
+                          with spatial index, GPKG also with attribute indexes
+    """
+    EXTENSIONS = {
+        'GeoJSON': 'geojson',
+        'GPKG': 'gpkg',
+        'FlatGeobuf': 'fgb'
+    }
+    LAYER_NAME = 'footprint'
+    INDEX_FIELDS = [ 'datetime', 'orbit', 'crs' ]
+
+    def __init__(self,
+            filepath:str,
+            driver:str,
+            transform_context:QgsCoordinateTransformContext,
+            getBandNames:Callable[[], List[str]]=None
+        ):
+        self.filepath = filepath
+        self.driver = driver
+        self._transform_context = transform_context
+        self._getBandNames = getBandNames
+        self._is_typed = not driver == 'GeoJSON'
+        self._band_names = None
+        self._writer = None
+        self.count = 0
+
+    def _fields(self)->QgsFields:
+        field_types = [
+            {
+                'name': 'id',
+                'type': QMetaType.QString,
+                'length': 100,
+            }
+        ]
+        if self._is_typed:
+            field_types += [
+                { 'name': 'datetime', 'type': QMetaType.QDateTime, 'length': 0 },
+                { 'name': 'created', 'type': QMetaType.QDateTime, 'length': 0 },
+                { 'name': 'orbit', 'type': QMetaType.QString, 'length': 20 },
+                { 'name': 'crs', 'type': QMetaType.QString, 'length': 20 }
+            ]
+            field_types += [
+                { 'name': f"href_{band}", 'type': QMetaType.QString, 'length': 0 }
+                for band in self._band_names
+            ]
+        else:
+            field_types += [
+                {
+                    'name': 'properties',
+                    'type': QMetaType.QString,
+                    'length': 500,
+                },
+                {
+                    'name': 'bands',
+                    'type': QMetaType.QString,
+                    'length': 0, # Unlimit
+                }
+            ]
+        fields = QgsFields()
+        for field in field_types:
+            fields.append(
+                QgsField( name=field['name'], type=field['type'], len=field['length'] )
+            )
+
+        return fields
+
+    def _create(self, data:dict)->None:
+        if self._is_typed:
+            self._band_names = list( data['bands'].keys() ) if self._getBandNames is None else self._getBandNames()
+
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = self.driver
+        if self._is_typed:
+            options.layerName = self.LAYER_NAME
+            options.layerOptions = [ 'SPATIAL_INDEX=YES' ]
+        self._writer = QgsVectorFileWriter.create(
+            self.filepath,
+            self._fields(),
+            QgsWkbTypes.MultiPolygon,
+            QgsCoordinateReferenceSystem('EPSG:4326'),
+            self._transform_context,
+            options
+        )
+
+    def _attributes(self, asset:str, data:dict)->list:
+        def toDateTime(value:str)->QDateTime:
+            dt = QDateTime.fromString( value, Qt.ISODateWithMs )
+            return dt if dt.isValid() else QDateTime.fromString( value, Qt.ISODate )
+
+        if not self._is_typed:
+            return [asset] + [ json.dumps( data[k] ) for k in data if not k == 'geometry' ]
+
+        p = data['properties']
+        ( orbit, crs ) = p['orbit_crs'].rsplit( '_', 1 )
+        bands = data['bands']
+        return [
+            asset,
+            toDateTime( p['datetime'] ),
+            toDateTime( p['created'] ),
+            orbit, crs
+        ] + [ bands[ band ]['href'] if band in bands else None for band in self._band_names ]
+
+    def _createAttributeIndexes(self)->None:
+        if not self.driver == 'GPKG':
+            return
+
+        ds = ogr.Open( self.filepath, 1 )
+        if ds is None:
+            return
+        for field in self.INDEX_FIELDS:
+            ds.ExecuteSQL( f'CREATE INDEX IF NOT EXISTS "{self.LAYER_NAME}_{field}" ON "{self.LAYER_NAME}"("{field}")' )
+        ds = None
+
+    def addFeatures(self, features:dict)->None:
+        for asset, data in features.items():
+            geom = QgsJsonUtils.geometryFromGeoJson( json.dumps( data['geometry'] ) )
+            geom.convertToMultiType()
+            if self._writer is None:
+                self._create( data )
+
+            feature = QgsFeature()
+            feature.setGeometry( geom )
+            feature.setAttributes( self._attributes( asset, data ) )
+            self._writer.addFeature( feature )
+            self.count += 1
+
+        if not self._writer is None:
+            self._writer.flushBuffer()
+
+    def close(self)->None:
+        if self._writer is None:
+            return
+
+        self._writer = None
+        self._createAttributeIndexes()
+
+    def remove(self)->None:
+        self.close()
+        if os.path.exists( self.filepath ):
+            os.remove( self.filepath )
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Page Fetcher
+                            Prefetch of STAC pages
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import queue
+import threading
+from typing import Callable, Iterator, Union
+
+
+class PageFetcher():
+    """
+    Producer thread that follows the 'next' links of a STAC search.
+    The pages are fetched ahead of the consumer into a bounded queue,
+    so the HTTP latency overlaps the processing of the current page.
+    The fetch of a page yields events (see SearchPage), the features of a streamed page
+    are queued as they are parsed, the last event is the end of page.
+    """
+    _END = object()
+
+    def __init__(self,
+            fetch:Callable[[dict], Iterator[dict]],
+            getNextArgs:Callable[[dict], Union[dict, None]],
+            size:int
+        ):
+        self._fetch = fetch # args -> events of page
+        self._getNextArgs = getNextArgs # r (end of page) -> args | None
+        self._queue = queue.Queue( maxsize=max( size, 1 ) )
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _put(self, item)->bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put( item, timeout=0.2 )
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def _run(self, args:dict)->None:
+        try:
+            while not self._stop.is_set():
+                r = None
+                events = self._fetch( args )
+                try:
+                    for r in events:
+                        if not self._put( r ):
+                            return
+                finally:
+                    events.close()
+
+                args = self._getNextArgs( r ) if not r is None and r['is_ok'] else None
+                if args is None:
+                    break
+        except Exception as e:
+            # The consumer receives the error as end of page
+            self._put( { 'is_ok': False, 'message': str( e ) } )
+        finally:
+            self._put( self._END )
+
+    def start(self, args:dict)->None:
+        self._thread = threading.Thread( target=self._run, args=( args, ), daemon=True )
+        self._thread.start()
+
+    def stop(self)->None:
+        self._stop.set()
+        # Unblock the producer
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        if not self._thread is None:
+            self._thread.join()
+            self._thread = None
+
+    def pages(self)->Iterator[dict]:
+        while True:
+            try:
+                item = self._queue.get( timeout=0.2 )
+            except queue.Empty:
+                if self._stop.is_set() or self._thread is None or not self._thread.is_alive():
+                    if self._queue.empty():
+                        return
+                continue
+
+            if item is self._END:
+                return
+            yield item
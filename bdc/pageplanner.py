@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Page Planner
+                            Adaptive page size of STAC pagination
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+class PagePlanner():
+    """
+    The first page is requested with the default limit (first results quickly).
+    From 'context.matched', the latency and the size of the first page,
+    the limit of the next pages is raised once, bounded by:
+        - the server maximum ('max_limit');
+        - the memory of a page ('max_page_bytes');
+        - the time of a page ('max_page_seconds'), away from the timeout.
+    For page-number pagination the next page is realigned to the new limit,
+    the repeated items are discarded by id.
+    """
+    def __init__(self,
+            max_limit:int,
+            max_page_bytes:int,
+            max_page_seconds:float
+        ):
+        self.max_limit = max_limit
+        self.max_page_bytes = max_page_bytes
+        self.max_page_seconds = max_page_seconds
+        self._consumed = 0
+        self._is_planned = False
+
+    @staticmethod
+    def getMatched(result:dict)->int:
+        if 'context' in result and 'matched' in result['context']:
+            return result['context']['matched']
+        return result.get('numberMatched')
+
+    def plan(self, matched:int, returned:int, size:int, elapsed:float)->int:
+        limits = [ self.max_limit, max( matched, returned ) ]
+        bytes_item = size / returned
+        if bytes_item > 0:
+            limits.append( int( self.max_page_bytes / bytes_item ) )
+        if elapsed > 0:
+            limits.append( int( returned * self.max_page_seconds / elapsed ) )
+
+        return max( returned, min( limits ) )
+
+    def nextArgs(self, r:dict, args:dict)->dict:
+        """
+        r: End of page, with 'returned' (features), 'size' (bytes) and 'elapsed' (seconds)
+        args: Request of next page, the limit is in the query (GET) or in the body (POST)
+        """
+        returned = r['returned']
+        self._consumed += returned
+        if self._is_planned or not returned:
+            return args
+
+        self._is_planned = True
+        matched = self.getMatched( r['result'] )
+        if matched is None or matched <= self._consumed:
+            return args
+
+        limit = self.plan( matched, returned, r['size'], r['elapsed'] )
+        if limit <= returned:
+            return args
+
+        if 'json' in args:
+            body = args['json'] | { 'limit': limit }
+            if 'page' in body:
+                body['page'] = self._consumed // limit + 1
+            return args | { 'json': body }
+
+        ( scheme, netloc, path, query, fragment ) = urlsplit( args['url'] )
+        params = dict( parse_qsl( query, keep_blank_values=True ) )
+        params['limit'] = str( limit )
+        if 'page' in params:
+            params['page'] = str( self._consumed // limit + 1 )
+
+        return args | { 'url': urlunsplit( ( scheme, netloc, path, urlencode( params ), fragment ) ) }
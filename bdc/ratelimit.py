@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Rate Limit
+                            Retry, backoff and rate limiting of HTTP
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Union
+from urllib.parse import urlparse
+
+
+class RetryPolicy():
+    """
+    Exponential backoff with full jitter, the 'Retry-After' of server has priority
+    """
+    RETRY_STATUS = ( 429, 500, 502, 503, 504 )
+
+    def __init__(self, retries:int=4, base:float=0.5, maximum:float=30.0):
+        self.retries = retries
+        self.base = base
+        self.maximum = maximum
+
+    def isRetry(self, status_code:int)->bool:
+        return status_code in self.RETRY_STATUS
+
+    @staticmethod
+    def retryAfter(value:Union[str, None])->Union[float, None]:
+        if not value:
+            return None
+        try:
+            return max( float( value ), 0.0 )
+        except ValueError:
+            pass
+        try:
+            return max( parsedate_to_datetime( value ).timestamp() - time.time(), 0.0 )
+        except ( TypeError, ValueError ):
+            return None
+
+    def delay(self, attempt:int, retry_after:Union[str, None]=None)->float:
+        seconds = self.retryAfter( retry_after )
+        if not seconds is None:
+            return min( seconds, self.maximum )
+
+        return random.uniform( 0, min( self.maximum, self.base * 2 ** attempt ) )
+
+
+class TokenBucket():
+    """
+    'rate' requests per second, bursts up to 'capacity'
+    """
+    def __init__(self, rate:float, capacity:int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float( capacity )
+        self._time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self)->None:
+        # Inside the lock
+        now = time.monotonic()
+        self._tokens = min( self.capacity, self._tokens + ( now - self._time ) * self.rate )
+        self._time = now
+
+    def _take(self)->float:
+        # Return the seconds to wait for a token, 0 when taken
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return ( 1 - self._tokens ) / self.rate
+
+    def acquire(self)->None:
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep( wait )
+
+    async def acquireAsync(self)->None:
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep( wait )
+
+    def setRate(self, rate:float, drain:bool=False)->None:
+        """
+        drain: The burst is discarded (server overloaded)
+        """
+        with self._lock:
+            self._refill() # Tokens of the previous rate
+            self.rate = rate
+            if drain:
+                self._tokens = min( self._tokens, 1.0 )
+
+
+class HostRateLimiter():
+    """
+    One token bucket by host, with adaptive rate (AIMD):
+    multiplicative decrease when the server is overloaded (429/503),
+    additive recovery for each response not overloaded, up to 'rate'.
+    The decreases of the responses in flight at the same time count once ('cooldown' seconds).
+    """
+    OVERLOAD_STATUS = ( 429, 503 )
+
+    def __init__(self,
+            rate:float=10,
+            capacity:int=20,
+            min_rate:float=0.5,
+            decrease:float=0.5,
+            increase:float=0.1,
+            cooldown:float=1.0
+        ):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.decrease = decrease
+        self.increase = increase
+        self.cooldown = cooldown
+        self._buckets = {}
+        self._decreased = {} # host -> time of last decrease
+        self._lock = threading.Lock()
+
+    def _bucket(self, host:str)->TokenBucket:
+        with self._lock:
+            if not host in self._buckets:
+                self._buckets[ host ] = TokenBucket( self.rate, self.capacity )
+            return self._buckets[ host ]
+
+    def acquire(self, url:str)->None:
+        self._bucket( urlparse( url ).netloc ).acquire()
+
+    async def acquireAsync(self, url:str)->None:
+        await self._bucket( urlparse( url ).netloc ).acquireAsync()
+
+    def isOverload(self, status_code:int)->bool:
+        return status_code in self.OVERLOAD_STATUS
+
+    def update(self, url:str, status_code:int)->None:
+        """
+        Status of the response of a request acquired
+        """
+        host = urlparse( url ).netloc
+        bucket = self._bucket( host )
+        with self._lock:
+            if not self.isOverload( status_code ):
+                if bucket.rate < self.rate:
+                    bucket.setRate( min( self.rate, bucket.rate + self.increase ) )
+                return
+
+            now = time.monotonic()
+            if host in self._decreased and now - self._decreased[ host ] < self.cooldown:
+                return
+            self._decreased[ host ] = now
+            bucket.setRate( max( self.min_rate, bucket.rate * self.decrease ), drain=True )
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Search Planner
+                            Incremental search of STAC
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+from typing import List, Union
+
+# Dates are 'yyyy-MM-dd' strings, the datetime of search is the closed interval ini T00:00:00Z / end T00:00:00Z.
+# The windows share their limits with the last search, the items repeated are replaced by id.
+
+def intersectionDates(dates:list, other:list)->Union[list, None]:
+    ini, end = max( dates[0], other[0] ), min( dates[1], other[1] )
+    return [ ini, end ] if ini < end else None
+
+def differenceDates(dates:list, other:list)->List[list]:
+    """
+    Intervals of 'dates' not covered by 'other'
+    """
+    intervals = []
+    if dates[0] < other[0]:
+        intervals.append( [ dates[0], min( dates[1], other[0] ) ] )
+    if dates[1] > other[1]:
+        intervals.append( [ max( dates[0], other[1] ), dates[1] ] )
+
+    return intervals
+
+def intersectionBBox(bbox:list, other:list)->Union[list, None]:
+    inter = [
+        max( bbox[0], other[0] ), max( bbox[1], other[1] ),
+        min( bbox[2], other[2] ), min( bbox[3], other[3] )
+    ]
+    return inter if ( inter[0] < inter[2] and inter[1] < inter[3] ) else None
+
+def differenceBBox(bbox:list, other:list)->List[list]:
+    """
+    Rectangles of 'bbox' not covered by 'other' (at most 4)
+    """
+    inter = intersectionBBox( bbox, other )
+    if inter is None:
+        return [ bbox ]
+
+    ( min_x, min_y, max_x, max_y ) = bbox
+    ( i_min_x, i_min_y, i_max_x, i_max_y ) = inter
+    rects = []
+    if min_x < i_min_x:
+        rects.append( [ min_x, min_y, i_min_x, max_y ] )
+    if i_max_x < max_x:
+        rects.append( [ i_max_x, min_y, max_x, max_y ] )
+    if min_y < i_min_y:
+        rects.append( [ i_min_x, min_y, i_max_x, i_min_y ] )
+    if i_max_y < max_y:
+        rects.append( [ i_min_x, i_max_y, i_max_x, max_y ] )
+
+    return rects
+
+def planIncrementalSearch(last:dict, current:dict)->Union[List[tuple], None]:
+    """
+    last, current: { 'collection', 'dates', 'bbox' }
+    Return the windows [ ( bbox, dates ) ] not covered by the last search,
+    or None when the searches do not overlap (full search).
+    """
+    if not current['collection'] == last['collection'] or last['dates'] is None or last['bbox'] is None:
+        return None
+
+    common_dates = intersectionDates( current['dates'], last['dates'] )
+    common_bbox = intersectionBBox( current['bbox'], last['bbox'] )
+    if common_dates is None or common_bbox is None:
+        return None
+
+    windows = [ ( current['bbox'], dates ) for dates in differenceDates( current['dates'], last['dates'] ) ]
+    windows += [ ( bbox, common_dates ) for bbox in differenceBBox( current['bbox'], last['bbox'] ) ]
+
+    return windows
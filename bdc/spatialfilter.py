@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Spatial Filter
+                            Filter of geometries by AOI
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import json
+from typing import List, Union
+
+from osgeo import ogr
+
+try:
+    import shapely
+    from shapely.geometry import shape, box
+    HAS_SHAPELY = int( shapely.__version__.split('.')[0] ) >= 2
+except ImportError:
+    HAS_SHAPELY = False
+
+
+class SpatialFilter():
+    """
+    AOI (bbox, EPSG:4326) built once per search.
+    The envelope of a geometry resolves most of tests, because the AOI is a rectangle:
+    disjoint envelope -> out, envelope inside AOI -> in.
+    Only the remaining geometries are tested exactly, in batch with shapely 2 when available.
+    """
+    OUT = 'out'
+    IN = 'in'
+    UNCERTAIN = 'uncertain'
+
+    def __init__(self, bbox:list):
+        def geometryOGR():
+            ( min_x, min_y, max_x, max_y ) = self.bbox
+            ring = ogr.Geometry( ogr.wkbLinearRing )
+            ring.AddPoint_2D( min_x, min_y )
+            ring.AddPoint_2D( max_x, min_y )
+            ring.AddPoint_2D( max_x, max_y )
+            ring.AddPoint_2D( min_x, max_y )
+            ring.AddPoint_2D( min_x, min_y )
+            geom = ogr.Geometry( ogr.wkbPolygon )
+            geom.AddGeometry( ring )
+
+            return geom
+
+        self.bbox = tuple( bbox )
+        if HAS_SHAPELY:
+            self._aoi = box( *self.bbox )
+            shapely.prepare( self._aoi )
+        else:
+            self._aoi = geometryOGR()
+
+    @staticmethod
+    def envelope(json_geom:Union[dict, None])->Union[tuple, None]:
+        """
+        None for a null geometry (allowed by STAC), an empty geometry or without 'coordinates'
+        """
+        def points(coords):
+            if not isinstance( coords, (list, tuple) ) or not len( coords ):
+                return
+            if isinstance( coords[0], (int, float) ):
+                if len( coords ) >= 2:
+                    yield coords
+                return
+            for c in coords:
+                yield from points( c )
+
+        if not isinstance( json_geom, dict ):
+            return None
+
+        xs, ys = [], []
+        for p in points( json_geom.get('coordinates') ):
+            xs.append( p[0] )
+            ys.append( p[1] )
+        if not len( xs ):
+            return None
+
+        return ( min( xs ), min( ys ), max( xs ), max( ys ) )
+
+    def relation(self, envelope:Union[list, tuple, None])->str:
+        if envelope is None or not len( envelope ) == 4:
+            return self.UNCERTAIN
+
+        ( min_x, min_y, max_x, max_y ) = self.bbox
+        if envelope[0] > max_x or envelope[2] < min_x or envelope[1] > max_y or envelope[3] < min_y:
+            return self.OUT
+        if envelope[0] >= min_x and envelope[2] <= max_x and envelope[1] >= min_y and envelope[3] <= max_y:
+            return self.IN
+
+        return self.UNCERTAIN
+
+    def _intersectsExact(self, geoms:List[dict])->List[bool]:
+        if not len( geoms ):
+            return []
+
+        if HAS_SHAPELY:
+            values = shapely.intersects( self._aoi, [ shape( g ) for g in geoms ] )
+            return [ bool( v ) for v in values ]
+
+        return [ self._aoi.Intersects( ogr.CreateGeometryFromJson( json.dumps( g ) ) ) for g in geoms ]
+
+    def intersectsRecord(self, wkb:Union[bytes, None], envelope:Union[tuple, None])->bool:
+        """
+        Geometry of FeatureRecord: the envelope first, then the exact test from the WKB (not decoded to GeoJSON)
+        """
+        if wkb is None:
+            return False
+
+        rel = self.relation( envelope )
+        if not rel == self.UNCERTAIN:
+            return rel == self.IN
+
+        if HAS_SHAPELY:
+            return bool( shapely.intersects( self._aoi, shapely.from_wkb( wkb ) ) )
+
+        return self._aoi.Intersects( ogr.CreateGeometryFromWkb( wkb ) )
+
+    def intersects(self, json_geom:dict)->bool:
+        return self.intersectsMany( [ json_geom ] )[0]
+
+    def intersectsMany(self, geoms:List[Union[dict, None]])->List[bool]:
+        """
+        A null or empty geometry does not intersect (not known where it is)
+        """
+        values = []
+        pending = []
+        for idx, geom in enumerate( geoms ):
+            envelope = None if geom is None else self.envelope( geom )
+            if envelope is None and ( geom is None or 'coordinates' in geom ):
+                values.append( False )
+                continue
+            rel = self.relation( envelope )
+            values.append( rel == self.IN )
+            if rel == self.UNCERTAIN:
+                pending.append( idx )
+
+        hits = self._intersectsExact( [ geoms[ idx ] for idx in pending ] )
+        for idx, hit in zip( pending, hits ):
+            values[ idx ] = hit
+
+        return values
+
+    def classifyMany(self,
+            item_bboxes:List[Union[list, None]],
+            geoms:List[dict],
+            is_footprint:bool
+        )->List[str]:
+        """
+        First tier from STAC item (bbox and geometry), without open the COG.
+        is_footprint: The geometry of item is the footprint of scene
+        An item with a null geometry is classified by its bbox, uncertain when the bbox is missing.
+        """
+        tiers = []
+        pending = []
+        for idx, item_bbox in enumerate( item_bboxes ):
+            rel = self.relation( item_bbox )
+            tiers.append( rel )
+            if rel == self.UNCERTAIN and not geoms[ idx ] is None:
+                pending.append( idx )
+
+        hits = self.intersectsMany( [ geoms[ idx ] for idx in pending ] )
+        for idx, hit in zip( pending, hits ):
+            if not hit:
+                tiers[ idx ] = self.OUT
+                continue
+            tiers[ idx ] = self.IN if is_footprint else self.UNCERTAIN
+
+        return tiers
@@ -18,17 +18,36 @@
  ***************************************************************************/
  """
 
+import io
 import requests
-from typing import Callable, List
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Union
+from urllib.parse import urlsplit, parse_qsl
+
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 
 from osgeo import osr
 #gdal.SetConfigOption("GDAL_HTTP_HEADER", "Authorization: Bearer SEU_TOKEN")
 
 from .translate import tr
+from .pagefetcher import PageFetcher
+from .pageplanner import PagePlanner
+from .streamparser import (
+    TeeReader, SearchPage, StreamError,
+    isStreamAvailable, iterFeatureCollection
+)
+from .cache import HttpCache, CachedResponse, RasterMetaCache
+from .asynctransport import AsyncStacTransport
+from .ratelimit import RetryPolicy, HostRateLimiter
+from .spatialfilter import SpatialFilter
+from .featurestore import FeatureStore, FeatureRecord
+from .vrtwriter import rasterMetaFromStac
 
 from abc import abstractmethod
 
-from qgis.core import Qgis
+from qgis.core import Qgis, QgsMessageLog
 from qgis.PyQt.QtCore import QObject, pyqtSignal
 
 
@@ -40,51 +59,616 @@ class StacClient(QObject):
             return sr
 
         self.STAC_URL = None # Sub Class
-        self.LIMIT = 10
+        self.LIMIT = 10 # First page
+        self.MAX_LIMIT = 1000 # Server maximum, the next pages are sized by PagePlanner
+        self.MAX_PAGE_BYTES = 16 * 1024 * 1024
+        self.MAX_PAGE_SECONDS = 5.0 # Away from the timeout of request
+        self.PREFETCH_PAGES = 2 # Look-ahead of pages, 0 = sequential pagination
+        self.PREFETCH_FEATURES = 250 # Bound of the features queued ahead of the consumer (memory of streaming)
+        self.STREAM_JSON = True # Features of page parsed as the bytes arrive, when ijson is installed
+        self.CACHE_STREAM_MAX_BYTES = 2 * 1024 * 1024 # A larger page streamed is not kept for the HTTP cache (memory)
+        self.HEADER_BYTES = 16 * 1024 # Range request of TIFF header (CRS probe)
+        self.SEARCH_POST = True # POST /search with fields extension, GET when refused by server
+        self.SEARCH_POST_FALLBACK_STATUS = ( 404, 405, 501 ) # POST not supported (not a bad query)
+        self._search_method = None # Session: 'GET' when the POST search was refused
+        self._search_get_fields = True # Session: False when the GET search refused the 'fields' parameter
 
         self.collection = None # dict
         self._collections_cog_bands_meta = {}
+        self._collections_meta_stored = {} # Time of collection document
+        self._collections_meta_refreshing = set()
 
         self._session = requests.Session()
         # session.headers.update({'Authorization': 'Bearer SEU_TOKEN'})
 
-        self._features = {}
+        self._retry_policy = RetryPolicy( retries=4, base=0.5, maximum=30.0 )
+        self._rate_limiter = HostRateLimiter( rate=10, capacity=20 ) # Requests per second by host, lowered on 429/503
+        self._isCanceled = lambda: False # Task of current search, see cancelScope
+
+        self._cache = None # HttpCache, Sub Class
+        self.CACHE_TTL_SEARCH = 60 * 60 # Seconds
+        self.CACHE_TTL_COLLECTION = 24 * 60 * 60
+
+        self.ASYNC_TRANSPORT = True # Used when httpx is installed, the transport is logged at first use
+        self.ASYNC_MAX_CONNECTIONS = 10
+        self.ASYNC_HTTP2 = False
+        self._async_transport = None # AsyncStacTransport, created at first use
+
         self._feat_key_spatial_res = 'spatial_res'
         self._feat_key_crs = 'crs'
         self._feat_key_orbit_crs = f"orbit_{self._feat_key_crs}"
+        self._features = FeatureStore( self._feat_key_spatial_res, self._feat_key_orbit_crs )
+        self._raster_meta_cache = RasterMetaCache() # Memory, Sub Class can use a file
 
         self._request_count = None
         
         self._srs4326 = sr4326()
 
-    def _getResponse(self, args:dict)->dict:
+    def _cacheLookup(self, args:dict, ttl:float)->dict:
+        """
+        Return the args of request (with conditional headers) and the fresh response of cache (or None)
+        """
+        lookup = { 'key': None, 'entry': None, 'args': args, 'response': None }
+        if self._cache is None or ttl is None:
+            return lookup
+
+        lookup['key'] = HttpCache.key( args )
+        entry = self._cache.get( lookup['key'] )
+        if entry is None:
+            return lookup
+
+        lookup['entry'] = entry
+        if self._cache.isFresh( entry, ttl ):
+            lookup['response'] = CachedResponse( entry['body'], entry['url'], entry['stored'] )
+            return lookup
+
+        lookup['args'] = args | { 'headers': args.get( 'headers', {} ) | self._cache.conditionalHeaders( entry ) }
+        return lookup
+
+    def _cacheStore(self, lookup:dict, status_code:int, content:bytes, headers:dict)->Union[CachedResponse, None]:
+        """
+        Return the response of cache when not modified (304)
+        """
+        if lookup['key'] is None:
+            return None
+
+        if status_code == 304 and not lookup['entry'] is None:
+            self._cache.touch( lookup['key'] )
+            return CachedResponse( lookup['entry']['body'], lookup['entry']['url'], time.time() )
+        if status_code == 200:
+            self._cache.put( lookup['key'], lookup['args']['url'], content, headers )
+
+        return None
+
+    @contextmanager
+    def cancelScope(self, isCanceled:Callable[[], bool]):
+        """
+        The waits between retries of requests are interrupted by the cancel of task
+        """
+        self._isCanceled = isCanceled
+        try:
+            yield
+        finally:
+            self._isCanceled = lambda: False
+
+    def _wait(self, seconds:float)->bool:
+        # Return False when cancelled
+        end = time.monotonic() + seconds
+        while not self._isCanceled():
+            remain = end - time.monotonic()
+            if remain <= 0:
+                return True
+            time.sleep( min( remain, 0.2 ) )
+
+        return False
+
+    def _getResponse(self, args:dict, ttl:float=None, stream:bool=False, session:requests.Session=None)->dict:
+        """
+        ttl: Seconds for use the HTTP cache, None = not cached
+        stream: The body (200) is not read, the caller stores it in cache with 'lookup'
+        session: Session of a background thread, None = session of client
+        'start': Time of the request answered, without the waits of rate limit and retries
+        """
+        args = args.copy()
         if self._verify_ssl == False:
             args['verify'] = False
+
+        lookup = self._cacheLookup( args, ttl )
+        if not lookup['response'] is None:
+            return {
+                'is_ok': True,
+                'response': lookup['response'],
+                'start': time.monotonic()
+            }
+
+        request_args = lookup['args'] | { 'stream': stream }
+        method = request_args.pop( 'method', 'GET' )
+        if session is None:
+            session = self._session
         msg_error = None
-        try:
-            response = self._session.get( **args)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as err:
-            msg_error = str(err)
-        except requests.exceptions.Timeout:
-            msg_error = tr("The request has timed out ({}).\nPlease check your internet connection or try again later").format( self.STAC_URL )
-        except requests.exceptions.RequestException as err:
-            msg_error = str(err)
+        status_code = None
+        for attempt in range( self._retry_policy.retries + 1 ):
+            is_last = attempt == self._retry_policy.retries
+            retry_after = None
+            msg_error = None
+            self._rate_limiter.acquire( lookup['args']['url'] )
+            try:
+                start = time.monotonic()
+                response = session.request( method, **request_args )
+                self._rate_limiter.update( lookup['args']['url'], response.status_code )
+                if self._retry_policy.isRetry( response.status_code ) and not is_last:
+                    retry_after = response.headers.get('Retry-After')
+                    response.close()
+                    if self._wait( self._retry_policy.delay( attempt, retry_after ) ):
+                        continue
+                    msg_error = tr('Process cancelled by user')
+                    break
+                response.raise_for_status()
+                break
+            except requests.exceptions.HTTPError as err:
+                msg_error = str(err)
+                status_code = err.response.status_code
+                break
+            except requests.exceptions.Timeout:
+                msg_error = tr("The request has timed out ({}).\nPlease check your internet connection or try again later").format( self.STAC_URL )
+            except requests.exceptions.ConnectionError as err:
+                msg_error = str(err)
+            except requests.exceptions.RequestException as err:
+                msg_error = str(err)
+                break
+
+            # Timeout or connection error
+            if is_last:
+                break
+            if not self._wait( self._retry_policy.delay( attempt ) ):
+                msg_error = tr('Process cancelled by user')
+                break
         
         if not msg_error is None:
             return {
                 'is_ok': False,
-                'message': msg_error
+                'message': msg_error,
+                'status_code': status_code
+            }
+
+        if stream and response.status_code == 200:
+            return {
+                'is_ok': True,
+                'response': response,
+                'lookup': lookup,
+                'start': start
             }
+
+        cached = self._cacheStore( lookup, response.status_code, response.content, response.headers )
+        if not cached is None:
+            response.close()
+            response = cached
         
         return {
             'is_ok': True,
-            'response': response
+            'response': response,
+            'start': start
         }
 
-    def _setCollectionsCOGBandsMeta(self)->dict:
+    def _getResults(self, list_args:List[dict], ttl:float=None, session:requests.Session=None)->List[dict]:
+        """
+        Results of requests (JSON documents), concurrently with the async transport when available
+        'stored': Time of the document (cache or request)
+        session: Session of a background thread without the async transport, None = session of client
+        """
+        results = [ None ] * len( list_args )
+        lookups = {}
+        for idx, args in enumerate( list_args ):
+            lookup = self._cacheLookup( args, ttl )
+            if not lookup['response'] is None:
+                response = lookup['response']
+                results[ idx ] = { 'is_ok': True, 'result': response.json(), 'size': len( response.content ), 'elapsed': 0.0, 'args': args, 'stored': response.stored }
+                continue
+            lookups[ idx ] = lookup
+
+        transport = self._asyncTransport() if len( lookups ) else None
+        if not transport is None:
+            responses = transport.runAll( [ lookup['args'] for lookup in lookups.values() ], self._isCanceled )
+            for ( idx, lookup ), r in zip( lookups.items(), responses ):
+                if not r['is_ok']:
+                    args = self._searchFallbackArgs( list_args[ idx ], r )
+                    results[ idx ] = r if args is None else self._getResult( args, ttl, session )
+                    continue
+                cached = self._cacheStore( lookup, r['status_code'], r['content'], r['headers'] )
+                if not cached is None:
+                    # Not modified (304)
+                    r = r | { 'result': cached.json(), 'size': len( cached.content ) }
+                if not 'result' in r:
+                    results[ idx ] = { 'is_ok': False, 'message': tr('Unexpected response ({}) for url: {}').format( r['status_code'], lookup['args']['url'] ) }
+                    continue
+                results[ idx ] = { 'is_ok': True, 'result': r['result'], 'size': r['size'], 'elapsed': r['elapsed'], 'args': list_args[ idx ], 'stored': time.time() }
+            return results
+
+        for idx in lookups:
+            results[ idx ] = self._getResult( list_args[ idx ], ttl, session )
+
+        return results
+
+    def _asyncTransport(self)->Union[AsyncStacTransport, None]:
+        """
+        Transport of the documents requested by _getResults (collections, first pages of incremental search),
+        the pages of search are streamed by the session of requests
+        """
+        if not self.ASYNC_TRANSPORT or not AsyncStacTransport.isAvailable():
+            if self._async_transport is None:
+                self._async_transport = False
+                msg = tr('STAC transport: requests (collections and first pages are sequential, httpx is not installed or disabled)')
+                QgsMessageLog.logMessage( message=msg, tag='BDC Catalog', level=Qgis.Info )
+            return None
+
+        if not self._async_transport:
+            self._async_transport = AsyncStacTransport(
+                self.STAC_URL, verify=self._verify_ssl,
+                max_connections=self.ASYNC_MAX_CONNECTIONS, http2=self.ASYNC_HTTP2,
+                retry_policy=self._retry_policy, rate_limiter=self._rate_limiter
+            )
+            msg = tr('STAC transport: asyncio (httpx) for collections and first pages, HTTP/2: {}').format( self._async_transport.http2 )
+            QgsMessageLog.logMessage( message=msg, tag='BDC Catalog', level=Qgis.Info )
+
+        return self._async_transport
+
+    def _getResult(self, args:dict, ttl:float=None, session:requests.Session=None)->dict:
+        """
+        Return the 'size' (bytes) and 'elapsed' (seconds, request and parse) of response, used by PagePlanner,
+        and the 'args' requested (GET when the POST search is refused)
+        """
+        r = self._getResponse( args, ttl, session=session )
+        args_fallback = self._searchFallbackArgs( args, r )
+        while not args_fallback is None:
+            args = args_fallback
+            r = self._getResponse( args, ttl, session=session )
+            args_fallback = self._searchFallbackArgs( args, r )
+        if not r['is_ok']:
+            return r
+
+        response = r['response']
+        if not response.status_code == 200:
+            response.close()
+            return {
+                'is_ok': False,
+                'message': response.text
+            }
+
+        size = len( response.content )
+        stored = getattr( response, 'stored', time.time() )
+        try:
+            result = response.json()
+        except ValueError as err:
+            return {
+                'is_ok': False,
+                'message': str( err )
+            }
+        finally:
+            response.close()
+
+        return {
+            'is_ok': True,
+            'result': result,
+            'size': size,
+            'elapsed': time.monotonic() - r['start'],
+            'args': args,
+            'stored': stored
+        }
+
+    def _fetchHeader(self, url:str)->bytes:
+        """
+        First bytes of file with one range request, empty when failed.
+        Not limited by the rate of STAC requests (same cost of the GDAL probe that it replaces)
+        """
+        headers = { 'Range': f"bytes=0-{self.HEADER_BYTES - 1}" }
+        try:
+            response = self._session.get( url, headers=headers, timeout=10, verify=self._verify_ssl, stream=True )
+        except requests.exceptions.RequestException:
+            return b''
+
+        try:
+            if not response.status_code in ( 200, 206 ):
+                return b''
+            # Server without range (200): only the header is read
+            return response.raw.read( self.HEADER_BYTES, decode_content=True )
+        except ( OSError, Urllib3HTTPError ):
+            return b''
+        finally:
+            response.close()
+
+    def _pageLimit(self, args:dict)->int:
+        if 'json' in args and 'limit' in args['json']:
+            return int( args['json']['limit'] )
+        if 'params' in args and 'limit' in args['params']:
+            return int( args['params']['limit'] )
+        query = dict( parse_qsl( urlsplit( args['url'] ).query ) )
+
+        return int( query.get( 'limit', self.LIMIT ) )
+
+    def _resultEvents(self, r:dict)->Iterator[dict]:
+        """
+        Events of page (see SearchPage) from the result parsed at once
+        """
+        if not r['is_ok']:
+            yield r
+            return
+
+        features = r['result'].get( 'features', [] )
+        yield { 'is_ok': True, 'total': len( features ) }
+        for feat in features:
+            yield { 'is_ok': True, 'feature': feat }
+        yield r | { 'returned': len( features ) }
+
+    def _openStream(self, args:dict, ttl:float=None)->dict:
+        """
+        Response (200) of page not read, with the 'args' requested (GET when the POST search is refused)
+        """
+        r = self._getResponse( args, ttl, stream=True )
+        args_fallback = self._searchFallbackArgs( args, r )
+        while not args_fallback is None:
+            args = args_fallback
+            r = self._getResponse( args, ttl, stream=True )
+            args_fallback = self._searchFallbackArgs( args, r )
+        if not r['is_ok']:
+            return r
+
+        response = r['response']
+        if not response.status_code == 200:
+            text = response.text
+            response.close()
+            return {
+                'is_ok': False,
+                'message': text
+            }
+
+        return r | { 'args': args }
+
+    def _streamEvents(self, args:dict, ttl:float=None)->Iterator[dict]:
+        """
+        Events of page (see SearchPage) with the features parsed as the bytes arrive.
+        The body is kept for the HTTP cache only when the cache is used, up to CACHE_STREAM_MAX_BYTES.
+        The 'total' of page is the limit requested, SearchPage has the features returned at the end.
+        A connection dropped in the middle of the body (the consumer holds the response open while
+        the features are processed) is requested again, the features already yielded are skipped.
+        """
+        r = self._openStream( args, ttl )
+        if not r['is_ok']:
+            yield r
+            return
+
+        args = r['args']
+        yield { 'is_ok': True, 'total': self._pageLimit( args ) }
+        returned = 0
+        for attempt in range( self._retry_policy.retries + 1 ):
+            response = r['response']
+            lookup = r.get('lookup')
+            is_cache_store = not lookup is None and not lookup['key'] is None
+            if isinstance( response, CachedResponse ):
+                fileobj = io.BytesIO( response.content )
+            else:
+                response.raw.decode_content = True
+                fileobj = response.raw
+            reader = TeeReader( fileobj, keep=is_cache_store, max_bytes=self.CACHE_STREAM_MAX_BYTES )
+
+            skip = returned
+            msg_error = None
+            try:
+                for kind, value in iterFeatureCollection( reader ):
+                    if kind == 'feature':
+                        if skip:
+                            skip -= 1
+                            continue
+                        returned += 1
+                        yield { 'is_ok': True, 'feature': value }
+                        continue
+                    result = value
+            except StreamError as err:
+                yield {
+                    'is_ok': False,
+                    'message': str( err )
+                }
+                return
+            except ( OSError, Urllib3HTTPError ) as err:
+                msg_error = str( err )
+            finally:
+                response.close()
+
+            if msg_error is None:
+                break
+
+            # Connection dropped: same page again
+            if attempt == self._retry_policy.retries or not self._wait( self._retry_policy.delay( attempt ) ):
+                yield {
+                    'is_ok': False,
+                    'message': msg_error
+                }
+                return
+            r = self._openStream( args, ttl )
+            if not r['is_ok']:
+                yield r
+                return
+
+        if is_cache_store and reader.is_kept:
+            self._cacheStore( lookup, 200, reader.getvalue(), response.headers )
+
+        yield {
+            'is_ok': True,
+            'result': result,
+            'returned': returned,
+            'size': reader.size,
+            'elapsed': time.monotonic() - r['start'],
+            'args': args
+        }
+
+    def _fetchEvents(self, args:dict)->Iterator[dict]:
+        if self.STREAM_JSON and isStreamAvailable():
+            return self._streamEvents( args, self.CACHE_TTL_SEARCH )
+
+        return self._resultEvents( self._getResult( args, self.CACHE_TTL_SEARCH ) )
+
+    def _iterPages(self,
+            args:dict,
+            getNextUrlFromResult:Callable[[dict], str],
+            first:dict=None
+        )->Iterator[dict]:
+        """
+        Yield { 'is_ok': True, 'page': SearchPage } or { 'is_ok': False, 'message' }
+        first: Result of first page already fetched (args is not requested)
+        The size of next pages is chosen by PagePlanner, the items repeated
+        by the realignment of page-number pagination are removed.
+        """
+        def getNextArgs(r:dict)->Union[dict, None]:
+            url = getNextUrlFromResult( r['result'] )
+            return None if url is None else planner.nextArgs( r, self._nextLinkArgs( r, url ) )
+
+        def isNew(feature:dict)->bool:
+            if feature['id'] in seen:
+                return False
+            seen.add( feature['id'] )
+            return True
+
+        def sequentialEvents(args:Union[dict, None])->Iterator[dict]:
+            while not args is None:
+                for r in self._fetchEvents( args ):
+                    yield r
+                args = getNextArgs( r ) if r['is_ok'] else None
+
+        def firstEvents()->Iterator[dict]:
+            yield from self._resultEvents( first )
+            if not first['is_ok']:
+                return
+            args = getNextArgs( first | { 'returned': len( first['result'].get( 'features', [] ) ) } )
+            if args is None:
+                return
+            if not self.PREFETCH_PAGES:
+                yield from sequentialEvents( args )
+                return
+
+            fetcher.start( args )
+            yield from fetcher.pages()
+
+        planner = PagePlanner( self.MAX_LIMIT, self.MAX_PAGE_BYTES, self.MAX_PAGE_SECONDS )
+        seen = set()
+        matched = None
+        consumed = 0
+        # Queue of events: PREFETCH_PAGES of features, at most PREFETCH_FEATURES (the producer waits)
+        size = min( self.PREFETCH_PAGES * ( self.MAX_LIMIT + 2 ), self.PREFETCH_FEATURES + 2 )
+        fetcher = PageFetcher( self._fetchEvents, getNextArgs, size )
+        if not first is None:
+            events = firstEvents()
+        elif not self.PREFETCH_PAGES:
+            events = sequentialEvents( args )
+        else:
+            fetcher.start( args )
+            events = fetcher.pages()
+
+        try:
+            for r in events:
+                if not r['is_ok']:
+                    yield r
+                    return
+
+                # Total estimated (limit of page) bounded by the items not received
+                total = r['total'] if matched is None else min( r['total'], max( matched - consumed, 0 ) )
+                page = SearchPage( events, total, isNew )
+                yield { 'is_ok': True, 'page': page }
+                page.close()
+                if not page.is_ok:
+                    return
+                consumed += page.total
+                matched = PagePlanner.getMatched( page.result )
+        finally:
+            events.close()
+            fetcher.stop()
+
+    def _nextLinkArgs(self, r:dict, url:str)->dict:
+        """
+        Request of 'next' link, the POST link has its body (merged with the request body when 'merge')
+        """
+        links = [ link for link in r['result'].get( 'links', [] ) if link.get('rel') == 'next' ]
+        link = links[0] if len( links ) else {}
+        if not link.get( 'method', 'GET' ).upper() == 'POST':
+            return { 'url': url, 'timeout': 10 }
+
+        body = link.get( 'body', {} )
+        if link.get( 'merge', False ):
+            body = r['args'].get( 'json', {} ) | body
+        args = { 'url': url, 'timeout': 10, 'method': 'POST', 'json': body }
+        if 'headers' in link:
+            args['headers'] = link['headers']
+
+        return args
+
+    def _searchFields(self)->dict:
+        """
+        Fields extension: only the keys of items used by _getIdItems and the search of sub class
+        """
+        include = [
+            'id', 'bbox', 'geometry',
+            'properties.datetime', f"properties.{self.collection['created']}",
+            'properties.proj:epsg', 'properties.proj:code',
+            'properties.proj:shape', 'properties.proj:transform'
+        ]
+        keys = ( 'href', 'proj:epsg', 'proj:code', 'proj:shape', 'proj:transform', 'raster:bands' )
+        for asset in self._collections_cog_bands_meta[ self.collection['id'] ]:
+            include += [ f"assets.{asset}.{key}" for key in keys ]
+
+        return { 'include': include }
+
+    def _searchGetArgs(self, args:dict)->dict:
+        """
+        GET /search from the POST args, the fields as comma separated (fields extension for GET)
+        """
+        p = {}
+        for key, value in args['json'].items():
+            if key == 'bbox':
+                value = ','.join( str(f) for f in value )
+            if key == 'fields':
+                if not self._search_get_fields:
+                    continue
+                value = ','.join( value.get( 'include', [] ) + [ f"-{f}" for f in value.get( 'exclude', [] ) ] )
+            p[ key ] = value
+
+        return { 'url': args['url'], 'timeout': args.get( 'timeout', 10 ), 'params': p }
+
+    def _searchFallbackArgs(self, args:dict, r:dict)->Union[dict, None]:
+        """
+        Args of search to retry, None when the error is not a refused search:
+            - POST not supported by server: GET (the next searches of session use GET);
+            - 'fields' of GET refused (400): GET without fields.
+        """
+        if r['is_ok']:
+            return None
+
+        if args.get('method') == 'POST' and r.get('status_code') in self.SEARCH_POST_FALLBACK_STATUS:
+            self._search_method = 'GET'
+            return self._searchGetArgs( args )
+
+        is_fields = not args.get('method') == 'POST' and 'fields' in args.get( 'params', {} )
+        if is_fields and r.get('status_code') == 400:
+            self._search_get_fields = False
+            params = { key: value for key, value in args['params'].items() if not key == 'fields' }
+            return args | { 'params': params }
+
+        return None
+
+    def _searchArgs(self, bbox:list, dates:list)->dict:
+        body = {
+            'collections': [ self.collection['id'] ],
+            'limit': self.LIMIT,
+            'bbox': list( bbox ),
+            'datetime': f"{dates[0]}T00:00:00Z/{dates[1]}T00:00:00Z"
+        }
+        args = {
+            'url': f"{self.STAC_URL}/search", 'timeout': 10,
+            'method': 'POST', 'json': body | { 'fields': self._searchFields() }
+        }
+
+        return args if self.SEARCH_POST and not self._search_method == 'GET' else self._searchGetArgs( args )
+
+    def _parseCollectionCOGBandsMeta(self, collection:dict, result:dict)->dict:
         def getSpatialRes(value):
-            keys = self.collection['spatial_res'].split(',')
+            keys = collection['spatial_res'].split(',')
             
             spatial_res = value[ keys[0] ][0][ keys[1] ] if (
                isinstance( value[ keys[0]], list ) 
@@ -92,29 +676,70 @@ class StacClient(QObject):
 
             return f"{int(spatial_res)}x{int(spatial_res)}"
 
-        args = {
-            'url': f"{self.STAC_URL}/collections/{self.collection['id']}"
-        }
-        r = self._getResponse( args )
-        if not r['is_ok']:
-            return r
-
-        result = r['response'].json()
         isBand = lambda value: (
                 'profile=cloud-optimized' in value['type']
             ) and (
-                self.collection['band_list'] in value and 
-                len( value[ self.collection['band_list'] ] ) == 1
+                collection['band_list'] in value and 
+                len( value[ collection['band_list'] ] ) == 1
         )
         assets = [ asset for asset, value in result['item_assets'].items() if isBand( value ) ]
 
-        meta = { 
+        return { 
             asset: {
                 self._feat_key_spatial_res: getSpatialRes( result['item_assets'][ asset] )
             }
             for asset in assets
         }
-        self._collections_cog_bands_meta[ self.collection['id'] ]  = meta
+
+    def _fetchCollectionCOGBandsMeta(self, collection:dict, ttl:float, session:requests.Session=None)->dict:
+        args = {
+            'url': f"{self.STAC_URL}/collections/{collection['id']}"
+        }
+        r = self._getResults( [ args ], ttl, session )[0]
+        if not r['is_ok']:
+            return r
+
+        try:
+            meta = self._parseCollectionCOGBandsMeta( collection, r['result'] )
+        except ( KeyError, IndexError, TypeError, ValueError ) as e:
+            return {
+                'is_ok': False,
+                'message': tr("Collection '{}': invalid metadata ({})").format( collection['id'], e )
+            }
+
+        self._collections_cog_bands_meta[ collection['id'] ] = meta
+        self._collections_meta_stored[ collection['id'] ] = r['stored']
+
+        return { 'is_ok': True }
+
+    def _refreshCollectionCOGBandsMeta(self, collection:dict)->None:
+        def run():
+            # Async transport or own session: the session of client is used by the search and the prefetch of pages
+            try:
+                with requests.Session() as session:
+                    r = self._fetchCollectionCOGBandsMeta( collection, 0, session ) # Revalidate
+                if not r['is_ok']:
+                    msg = tr("Refresh of collection '{}': {}").format( collection['id'], r['message'] )
+                    QgsMessageLog.logMessage( message=msg, tag='BDC Catalog', level=Qgis.Warning )
+            finally:
+                self._collections_meta_refreshing.discard( collection['id'] )
+
+        if collection['id'] in self._collections_meta_refreshing:
+            return
+
+        self._collections_meta_refreshing.add( collection['id'] )
+        threading.Thread( target=run, daemon=True ).start()
+
+    def _setCollectionsCOGBandsMeta(self)->dict:
+        # Served from memory or disk cache, a stale metadata is refreshed in background
+        if not self.collection['id'] in self._collections_cog_bands_meta:
+            r = self._fetchCollectionCOGBandsMeta( self.collection, float('inf') )
+            if not r['is_ok']:
+                return r
+
+        age = time.time() - self._collections_meta_stored[ self.collection['id'] ]
+        if age >= self.CACHE_TTL_COLLECTION:
+            self._refreshCollectionCOGBandsMeta( self.collection )
         
         return { 'is_ok': True }
 
@@ -139,6 +764,10 @@ class StacClient(QObject):
             if not asset in self._collections_cog_bands_meta[ self.collection['id'] ]:
                 continue
 
+            meta = rasterMetaFromStac( values, feature['properties'] )
+            if not meta is None:
+                self._raster_meta_cache.put( values['href'], meta, persist=False )
+
             assets_bands[ asset ] = {
                 'href': values['href'],
                 self._feat_key_spatial_res: self._collections_cog_bands_meta[ self.collection['id'] ][ asset ][ self._feat_key_spatial_res ]
@@ -146,38 +775,20 @@ class StacClient(QObject):
 
         return feature['id'], ( { 'geometry': feature['geometry'] } | {'properties': properties } | {'bands': assets_bands} )
 
-    def _processResponse(
+    def _processResult(
             self,
-            response:requests.Response,
+            page:SearchPage,
             requestProcessData:pyqtSignal,
             isCanceled:Callable[[], bool],
             getNameFromFeature:Callable[[dict], str],
-            getCRSFromFeature:Callable[[dict], str],
-            getNextUrlFromResult:Callable[[dict], str]
+            getCRSFromFeature:Callable[[dict], str]
         )->dict:
-        if not response.status_code == 200:
-            response.close()
-            return {
-                'is_ok': False,
-                'message': response.text
-            }
-
-        result = response.json()
-        response.close()
-
-        if not len( result['features'] ):
-            return {
-                'is_ok': True,
-                'returned': 0
-            }
-        
-        url_next = getNextUrlFromResult( result )
-
         features = {}
         count = 0
-        total = len( result['features'] )
-        for feat in result['features']:
+        total = page.total
+        for feat in page.features():
             count += 1
+            total = max( total, count )
 
             text = tr("Request ({}) processing {} of {}").format( self._request_count, count, total )
             requestProcessData.emit({
@@ -198,11 +809,22 @@ class StacClient(QObject):
                     'message': tr('Process cancelled by user')
                 }
 
+        if not page.is_ok:
+            return {
+                'is_ok': False,
+                'message': page.message
+            }
+
+        # Total of page known at the end (features returned)
+        requestProcessData.emit({
+            'type': 'progress_footprint',
+            'data': { 'count': count, 'total': max( page.total, count ) }
+        })
+
         return {
             'is_ok': True,
-            'returned': total,
-            'features': features,
-            'url_next': url_next
+            'returned': count,
+            'features': features
         }
 
     def _searchStacItems(
@@ -213,47 +835,39 @@ class StacClient(QObject):
             isCanceled:Callable[[], bool],
             getNameFromFeature:Callable[[dict], str],
             getCRSFromFeature:Callable[[dict], str],
-            getNextUrlFromResult:Callable[[dict], str]
-        )->dict:
-        p = {
-            'collections': [ self.collection['id'] ],
-            'limit': self.LIMIT,
-            'bbox': ','.join( str(f) for f in bbox ),
-            'datetime': f"{dates[0]}T00:00:00Z/{dates[1]}T00:00:00Z"
-        }
-        r = self._getResponse( {'url': f"{self.STAC_URL}/search", 'timeout': 10, 'params': p } )
-        if not r['is_ok']:
-            return r
-
-        return self._processResponse(
-            r['response'], requestProcessData, isCanceled,
-            getNameFromFeature, getCRSFromFeature, getNextUrlFromResult
-        )
-
-    def _fetchNextPage(
-            self,
-            url:str,
-            requestProcessData:pyqtSignal,
-            isCanceled:Callable[[], bool],
-            getNameFromFeature:Callable[[dict], str],
-            getCRSFromFeature:Callable[[dict], str],
-            getNextUrlFromResult:Callable[[dict], str]
+            getNextUrlFromResult:Callable[[dict], str],
+            addFeatures:Callable[[dict], None]=None
         )->dict:
-        r = self._getResponse( {'url':url, 'timeout': 10 } )
-        if not r['is_ok']:
-            return r
-
-        r = self._processResponse(
-            r['response'], requestProcessData, isCanceled,
-            getNameFromFeature, getCRSFromFeature, getNextUrlFromResult
-        )
-        if not r['is_ok'] or r['returned'] == 0:
-            return r
-        
-        self._features |= r['features']
+        # Pages are prefetched while the current page is processed
+        self._request_count = 0
+        total = 0
+        pages = self._iterPages( self._searchArgs( bbox, dates ), getNextUrlFromResult )
+        try:
+            for r in pages:
+                self._request_count += 1
+                if not r['is_ok']:
+                    return r
+
+                r = self._processResult(
+                    r['page'], requestProcessData, isCanceled,
+                    getNameFromFeature, getCRSFromFeature
+                )
+                if not r['is_ok']:
+                    return r
+                if r['returned'] == 0:
+                    break
+
+                self._features.update( r['features'] )
+                total += r['returned']
+                if not addFeatures is None:
+                    addFeatures( r['features'] )
+        finally:
+            pages.close()
 
-        del r['features']
-        return r
+        return {
+            'is_ok': True,
+            'returned': total
+        }
 
     def _messageTotalFeatures(self, total:int, requestProcessData:pyqtSignal)->None:
         msg = tr("STAC - Totals: {} received").format( total)
@@ -262,21 +876,49 @@ class StacClient(QObject):
             'data': { 'text': msg, 'level': Qgis.Info }
         })
 
-    def getFeatures(self)->List[dict]:
+    def getFeatures(self)->FeatureStore:
         return self._features
 
+    def getRasterMeta(self, href:str)->Union[dict, None]:
+        return self._raster_meta_cache.get( href )
+
+    def setRasterMeta(self, href:str, meta:dict)->None:
+        self._raster_meta_cache.put( href, meta )
+
+    def close(self)->None:
+        # Unload of plugin
+        self._session.close()
+        if self._async_transport:
+            self._async_transport.close()
+        if not self._cache is None:
+            self._cache.close()
+        self._raster_meta_cache.close()
+
+    def getBandNames(self)->List[str]:
+        return list( self._collections_cog_bands_meta[ self.collection['id'] ].keys() )
+
+    def pruneFeatures(self, bbox:list, dates:list)->None:
+        """
+        Keep the features of the last search inside the new bbox and dates (incremental search)
+        The dates are the closed interval of search: ini T00:00:00Z / end T00:00:00Z
+        """
+        def isInsideDates(record:FeatureRecord)->bool:
+            if record.date == dates[1]:
+                # Only at T00:00:00Z (fraction and UTC offset are zeros)
+                return record.datetime[:19] == end and not record.datetime[19:].strip('.0Z+:')
+            return dates[0] <= record.date < dates[1]
+
+        end = f"{dates[1]}T00:00:00"
+
+        spatial_filter = SpatialFilter( bbox )
+        isInside = lambda record: isInsideDates( record ) and spatial_filter.intersectsRecord( record.wkb, record.envelope )
+
+        ids = [ id for id, record in self._features.records() if not isInside( record ) ]
+        for id in ids:
+            del self._features[ id ]
+
     def getScenesByDateOrbitsCRS(self, spatial_resolution:str)->dict:
-        scene_list = {}
-        for asset, data in self._features.items():
-            p = data['properties']
-            scene_key = f"{p['datetime'].split('T')[0]}_{p[ self._feat_key_orbit_crs ]}"
-            urls = { asset: { band: f"{value['href']}" for band, value in data['bands'].items() if value[ self._feat_key_spatial_res ] == spatial_resolution } }
-            if not scene_key in scene_list:
-                scene_list[ scene_key ] = [ urls ]
-                continue
-            scene_list[ scene_key ].append( urls )
-        
-        return scene_list
+        return self._features.scenes( spatial_resolution )
 
     @abstractmethod
     def search(
@@ -284,7 +926,14 @@ class StacClient(QObject):
             bbox:list,
             dates:list,
             requestProcessData:pyqtSignal,
-            isCanceled:Callable[[str], None]
+            isCanceled:Callable[[str], None],
+            windows:List[tuple]=None,
+            addFeatures:Callable[[dict], None]=None
         )->dict:
+        """
+        windows: [ ( bbox, dates ) ] of incremental search, the current features are kept.
+                 None = search of bbox and dates
+        addFeatures: Receive the new features of each processed page
+        """
         pass
 
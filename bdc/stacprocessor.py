@@ -19,34 +19,61 @@
 
 import json
 import os
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Union
 
 from osgeo import gdal
 gdal.UseExceptions()
 
 from qgis.PyQt.QtCore import (
     QObject,
-    QMetaType,
     pyqtSlot, pyqtSignal
 )
 
 from qgis.core import (
     QgsApplication, QgsProject,
-    QgsRasterLayer, QgsVectorFileWriter,
-    QgsFeature, QgsFields, QgsField,
-    QgsCoordinateReferenceSystem,
-    QgsJsonUtils,
+    QgsRasterLayer,
     QgsTask, Qgis
 )
 from qgis.gui import QgisInterface
 
-from .taskmanager import TaskProcessor
+from .taskmanager import TaskProcessor, ThrottledSignal
 from .stacclient import StacClient
+from .footprintwriter import FootprintWriter
+from .searchplanner import planIncrementalSearch
+from .vsicurl_open import networkProfile, openUrl
+from .vrtwriter import writeSceneVRT, writeMosaicVRT, rasterMetaFromDataset, isSameGrid
+from .cogmaterializer import materializeCOG
 
 from .translate import tr
 
 # from .debugtask import DebugTask # DEBUG
 
+
+class ProgressVRTBuild():
+    """
+    Progress of the task aggregated from the concurrent VRT builds
+    """
+    def __init__(self, task:QgsTask, total:int):
+        self.task = task
+        self._total = max( total, 1 )
+        self._completes = {}
+        self._sum = 0.0
+        self._percent = -1
+        self._lock = threading.Lock()
+
+    def update(self, key:str, complete:float)->None:
+        with self._lock:
+            self._sum += complete - self._completes.get( key, 0.0 )
+            self._completes[ key ] = complete
+            percent = int( self._sum / self._total * 100 )
+            if percent == self._percent: # Only changes of 1%
+                return
+            self._percent = percent
+        self.task.setProgress( percent )
+
+
 class StacProcessor(QObject):
     finished = pyqtSignal()
     addMosaicScenes = pyqtSignal()
@@ -67,15 +94,25 @@ class StacProcessor(QObject):
             'separate': True,
             'bandList': [1],
             'callback': self._callbackVRTBuild,
-            'callback_data': None # QgsTask object will be set during VRT build
+            'callback_data': None # ( ProgressVRTBuild, key ) will be set during VRT build
         }
+        self.MOSAIC_WORKERS = 8 # Concurrent scene VRT builds
+        self.GDAL_NETWORK_STATS = True # Log the requests of GDAL (/vsicurl/) by task
+        self.VRT_FROM_META = True # VRT written from raster metadata (vrtwriter), False = gdal.BuildVRT
+        self.MATERIALIZE_MOSAICS = False # Local COG of all mosaics after the VRTs, else only by request (selected layers)
+        self.MATERIALIZE_WORKERS = 4 # Concurrent windows read of mosaic VRT
+        self.MATERIALIZE_CHUNK = 2048 # Pixels of side of window
         self.spatial_resolution = None
         self.dates = None
         self.dir_mosaic = None
         self.bbox = None
+        self.footprint_driver = 'GeoJSON' # FootprintWriter.EXTENSIONS
 
         self._last_search_params = { 'collection': None, 'spatial_resolution': None, 'dates': None, 'bbox': None  }
         self._is_ok_last_processed = None
+        self._search_windows = None # Incremental search: [ ( bbox, dates ) ]
+        self._mosaics_built = {} # name_mosaic: { 'ids', 'filepath', 'vrt_paths', 'layers' }
+        self._mosaics_materialized = {} # filepath of mosaic VRT: filepath of local COG
         
         self._str_search = None
 
@@ -84,6 +121,7 @@ class StacProcessor(QObject):
 
         self.project = QgsProject.instance()
         self.map_canvas = iface.mapCanvas()
+        self.layer_tree_view = iface.layerTreeView()
         self.taskManager = QgsApplication.taskManager()
         self.task_id = None
         self.is_task_canceled = False
@@ -95,8 +133,15 @@ class StacProcessor(QObject):
 
         self.addMosaicScenes.connect( self._onAddMosaicScenes )
 
-    def _search_run(self, task:QgsTask)->bool:
-        return self._client.search( self.bbox, self.dates, self.requestProcessData, task.isCanceled )
+    def _search_run(self,
+            task:QgsTask,
+            requestProcessData:ThrottledSignal,
+            addFeatures:Callable[[dict], None]
+        )->bool:
+        return self._client.search(
+            self.bbox, self.dates, requestProcessData, task.isCanceled,
+            self._search_windows, addFeatures
+        )
 
     def setCollection(self, collection:dict):
         self._client.collection = collection
@@ -105,63 +150,37 @@ class StacProcessor(QObject):
         if 'nodata' in self._client.collection:
             self._vrt_options['srcNodata'] = self._client.collection['nodata']
 
-    def _callbackVRTBuild(self, complete:float, message:str, user_data:QgsTask)->None:
-        if user_data.isCanceled():
+    def _callbackVRTBuild(self, complete:float, message:str, user_data:tuple)->None:
+        ( progress, key ) = user_data
+        if progress.task.isCanceled():
             return 0
 
-        user_data.setProgress( complete*100 )
+        progress.update( key, complete )
         return 1
 
-    def _search(self)->None:
-        def createFootprintLayerFile(filepath:str, driver:str, features:dict)->None:
-            # Create layer
-            field_types = [
-                {
-                    'name': 'id',
-                    'type': QMetaType.QString,
-                    'length': 100,
-                },
-                {
-                    'name': 'properties',
-                    'type': QMetaType.QString,
-                    'length': 500,
-                },
-                {
-                    'name': 'bands',
-                    'type': QMetaType.QString,
-                    'length': 0, # Unlimit
-                }
-            ]
-            fields = QgsFields()
-            for field in field_types:
-                fields.append(
-                    QgsField( name=field['name'], type=field['type'], len=field['length'] )
+    def _runNetworkProfile(self, run:Callable[[QgsTask], dict], name:str)->Callable[[QgsTask], dict]:
+        """
+        Run of task inside the GDAL network profile of collection ('gdal_config' of collection.json)
+        """
+        def runProfile(task:QgsTask)->dict:
+            gdal_config = self._client.collection.get('gdal_config')
+            with networkProfile( gdal_config, self.GDAL_NETWORK_STATS ) as stats:
+                result = run( task )
+
+            if stats.get('requests'):
+                msg = tr("{} - GDAL network: {} requests, {:.1f} MB").format(
+                    name, stats['requests'], stats['downloaded_bytes'] / ( 1024 * 1024 )
                 )
-            asset = list( features.keys() )[0]
-            geom = QgsJsonUtils.geometryFromGeoJson(json.dumps( features[ asset ]['geometry'] ) )
-            options = QgsVectorFileWriter.SaveVectorOptions()
-            options.driverName = driver
-            writer = QgsVectorFileWriter.create(
-                filepath,
-                fields,
-                geom.wkbType(),
-                QgsCoordinateReferenceSystem('EPSG:4326'),
-                self.project.transformContext(),
-                options
-            )
-            # Populate
-            for asset, data in features.items():
-                feature = QgsFeature()
-
-                geom = QgsJsonUtils.geometryFromGeoJson(json.dumps(data['geometry']))
-                feature.setGeometry( geom )
-
-                atts = [asset] + [ json.dumps( data[k] ) for k in data if not k == 'geometry' ]
-                feature.setAttributes( atts )
-
-                writer.addFeature( feature )
-            writer = None
+                self.requestProcessData.emit({
+                    'type': 'message_log',
+                    'data': { 'text': msg, 'level': Qgis.Info }
+                })
 
+            return result
+
+        return runProfile
+
+    def _search(self)->None:
         def on_finished(exception, data:dict)->None:
             self._is_ok_last_processed = False
 
@@ -200,19 +219,46 @@ class StacProcessor(QObject):
             self.addMosaicScenes.emit()
 
         def run(task:QgsTask)->dict:
+            def addFeatures(features:dict)->None:
+                # Page processed: appended to file and shown in preview layer
+                writer.addFeatures( features )
+                # Queued to the GUI thread: a copy, the caller can change its dict
+                self.requestProcessData.emit({
+                    'type': 'add_footprint_preview',
+                    'data': dict( features )
+                })
+
             # self.debug.active() # DEBUG
 
-            if not self._search_run( task ):
+            driver = self.footprint_driver if self.footprint_driver in FootprintWriter.EXTENSIONS else 'GeoJSON'
+            filepath = os.path.join( self.dir_mosaic, f"footprint.{self._str_search}.{FootprintWriter.EXTENSIONS[ driver ]}" )
+            writer = FootprintWriter( filepath, driver, self.project.transformContext(), self._client.getBandNames )
+            request_process_data = ThrottledSignal( self.requestProcessData )
+            try:
+                if not self._search_windows is None:
+                    self._client.pruneFeatures( self.bbox, self.dates )
+                    if len( self._client.getFeatures() ):
+                        addFeatures( dict( self._client.getFeatures() ) ) # Not the live store
+
+                with self._client.cancelScope( task.isCanceled ):
+                    is_ok = self._search_run( task, request_process_data, addFeatures )
+            finally:
+                request_process_data.flush()
+                writer.close()
+                self.requestProcessData.emit({
+                    'type': 'remove_footprint_preview',
+                    'data': None
+                })
+
+            if not is_ok:
+                writer.remove()
                 if task.isCanceled():
                     self.is_task_canceled = True
                 return { 'is_ok': False }
 
-            features = self._client.getFeatures()
-            if not len( features):
+            if not writer.count:
                 return { 'is_ok': True }
 
-            filepath = os.path.join( self.dir_mosaic, f"footprint.{self._str_search}.geojson" )
-            createFootprintLayerFile( filepath, 'GeoJSON', features )
             source = {'filepath': filepath, 'add_group': False, 'color': 'Gray', 'opacity': 0.1 }
             
             return { 'is_ok': True, 'source': source }
@@ -228,7 +274,7 @@ class StacProcessor(QObject):
         self._total_mosaic = None
 
         name = f"Create Footprint - {self._str_search}"
-        task = QgsTask.fromFunction( name, run, on_finished=on_finished )
+        task = QgsTask.fromFunction( name, self._runNetworkProfile( run, name ), on_finished=on_finished )
         self.task_processor.setTask( task, self._client.collection['id'] )
         self.taskManager.addTask( task )
         self.task_id = self.taskManager.taskId(task)
@@ -255,142 +301,255 @@ class StacProcessor(QObject):
                 'data': { 'text': msg, 'level': Qgis.Success }
             })
 
+            if self.MATERIALIZE_MOSAICS:
+                self.materializeMosaics( data['filepaths'] ) # Emit finished
+                return
+
             self.finished.emit()
 
         def run(task:QgsTask)->None:
-            def createRasterMosaicVRT(scene_list:List[dict], date_orbit_crs:str)->dict:
-                def writeVRTSource(filepath, source_type):
-                    data = {
-                        'collection_id': self._client.collection['id'],
-                        'source_type': source_type
-                    }
-                    with open( f"{filepath}.{self._client.TAG_ATT}.json", "w", encoding="utf-8") as f:
-                        json.dump( data, f, indent=4 )
+            def writeVRTSource(filepath, source_type):
+                data = {
+                    'collection_id': self._client.collection['id'],
+                    'source_type': source_type
+                }
+                with open( f"{filepath}.{self._client.TAG_ATT}.json", "w", encoding="utf-8") as f:
+                    json.dump( data, f, indent=4 )
 
-                def addBandNames(dataset:QgsRasterLayer, band_names:List[str])->None:
-                    for i, name in enumerate( band_names ):
-                        band = dataset.GetRasterBand( i + 1 )
-                        band.SetDescription( name )
+            def addBandNames(dataset:QgsRasterLayer, band_names:List[str])->None:
+                for i, name in enumerate( band_names ):
+                    band = dataset.GetRasterBand( i + 1 )
+                    band.SetDescription( name )
 
-                self._vrt_options['callback_data'] = task
-                options = gdal.BuildVRTOptions( **self._vrt_options )
+            def messageCancelled()->dict:
+                return {
+                    'is_ok': False,
+                    'message': tr('Process cancelled by user'),
+                    'level': Qgis.Critical
+                }
 
-                name_mosaic = f"{self._client.collection['id']}.{date_orbit_crs}_{self.spatial_resolution}"
-                dir_mosaic_scenes = os.path.join( self.dir_mosaic, self._str_search )
-                dir_scenes = os.path.join( dir_mosaic_scenes, name_mosaic )
-                os.makedirs(dir_scenes, exist_ok=True)
-                vrt_paths = []
-                for scene in scene_list:
-                    for scene_id, band_urls in scene.items():
-                        vrt_path = os.path.join( dir_scenes, f"{scene_id}_{self.spatial_resolution}.vrt")
-
-                        vsicurl_band_urls = [f"/vsicurl/{url}" for url in band_urls.values()]
-                        band_names = list( band_urls.keys() )
-                        
-                        # Reorder urls and band names to have RGB first
-                        rgb_index = [ band_names.index( b ) for b in self._client.collection['spatial_res_composite'][ self.spatial_resolution ] ]
-                        url_rgb = [ vsicurl_band_urls[i] for i in rgb_index ]
-                        for i in sorted( rgb_index, reverse=True ):
-                            del vsicurl_band_urls[i]
-                            del band_names[i]
-                        vsicurl_band_urls = url_rgb + vsicurl_band_urls
-                        band_names = self._client.collection['spatial_res_composite'][ self.spatial_resolution ] + band_names
-
-                        ds_ = gdal.BuildVRT (vrt_path, vsicurl_band_urls, options=options )
-                        if ds_ is None:
-                            return {
-                                'is_ok': False,
-                                'message': tr('Error building VRT for scene {}').format( scene_id ),
-                                'level': Qgis.Critical
-
-                            }
-                        if task.isCanceled():
-                            ds_ = None
-                            return {
-                                'is_ok': False,
-                                'message': tr('Process cancelled by user'),
-                                'level': Qgis.Critical
-                            }
-
-                        addBandNames( ds_, band_names )
-                        ds_ = None
-                        writeVRTSource( vrt_path, self._tag_att_values_source['url'])
+            def getSceneMeta(url:str)->Union[dict, None]:
+                # Same for the bands of scene (spatial resolution): STAC or one probe by scene
+                meta = self._client.getRasterMeta( url )
+                if meta is None:
+                    r = openUrl( url )
+                    if not r['is_ok'] or r['dataset'] is None:
+                        return None
+                    meta = rasterMetaFromDataset( r['dataset'] )
+                    r['dataset'] = None
+                    self._client.setRasterMeta( url, meta )
 
-                        vrt_paths.append( vrt_path )
+                if 'nodata' in self._client.collection:
+                    meta = meta | { 'nodata': self._client.collection['nodata'] }
 
-                filepath = os.path.join( dir_mosaic_scenes, f"{name_mosaic}.vrt")
-                ds_ = gdal.BuildVRT(filepath, vrt_paths)
+                return meta
+
+            def createSceneVRT(dir_scenes:str, scene_id:str, band_urls:dict, progress:tuple)->dict:
+                # Run in worker thread
+                if task.isCanceled():
+                    return messageCancelled()
+
+                vrt_path = os.path.join( dir_scenes, f"{scene_id}_{self.spatial_resolution}.vrt")
+
+                urls = list( band_urls.values() )
+                band_names = list( band_urls.keys() )
+                
+                # Reorder urls and band names to have RGB first
+                rgb_index = [ band_names.index( b ) for b in self._client.collection['spatial_res_composite'][ self.spatial_resolution ] ]
+                url_rgb = [ urls[i] for i in rgb_index ]
+                for i in sorted( rgb_index, reverse=True ):
+                    del urls[i]
+                    del band_names[i]
+                urls = url_rgb + urls
+                band_names = self._client.collection['spatial_res_composite'][ self.spatial_resolution ] + band_names
+
+                # VRT from metadata, without open the COG of each band
+                meta = getSceneMeta( urls[0] ) if self.VRT_FROM_META else None
+                if not meta is None:
+                    # Bands with known metadata (STAC or cache) in other grid: gdal.BuildVRT
+                    nodata = { 'nodata': meta['nodata'] } if 'nodata' in self._client.collection else {}
+                    metas = [ self._client.getRasterMeta( url ) for url in urls[1:] ]
+                    if any( not isSameGrid( meta, other | nodata ) for other in metas if not other is None ):
+                        meta = None
+                if not meta is None:
+                    writeSceneVRT( vrt_path, urls, band_names, meta )
+                    ( progress_vrt, key ) = progress
+                    progress_vrt.update( key, 1.0 )
+                    writeVRTSource( vrt_path, self._tag_att_values_source['url'])
+
+                    return {
+                        'is_ok': True,
+                        'vrt_path': vrt_path,
+                        'band_names': band_names,
+                        'meta': meta
+                    }
+
+                vsicurl_band_urls = [ f"/vsicurl/{url}" for url in urls ]
+                options = gdal.BuildVRTOptions( **( self._vrt_options | { 'callback_data': progress } ) )
+                try:
+                    ds_ = gdal.BuildVRT (vrt_path, vsicurl_band_urls, options=options )
+                except RuntimeError as e:
+                    if task.isCanceled():
+                        return messageCancelled()
+                    raise e
                 if ds_ is None:
                     return {
                         'is_ok': False,
-                        'message': tr('Error building mosaic VRT for date/orbit/crs {}').format( date_orbit_crs ),
+                        'message': tr('Error building VRT for scene {}').format( scene_id ),
                         'level': Qgis.Critical
+
                     }
                 if task.isCanceled():
                     ds_ = None
-                    return {
-                        'is_ok': False,
-                        'message': tr('Process cancelled by user'),
-                        'level': Qgis.Critical
-                    }
+                    return messageCancelled()
 
                 addBandNames( ds_, band_names )
+                meta = rasterMetaFromDataset( ds_ )
                 ds_ = None
+                writeVRTSource( vrt_path, self._tag_att_values_source['url'])
+
+                return {
+                    'is_ok': True,
+                    'vrt_path': vrt_path,
+                    'band_names': band_names,
+                    'meta': meta
+                }
+
+            def createRasterMosaicVRT(name_mosaic:str, date_orbit_crs:str, scenes:List[dict])->dict:
+                dir_mosaic_scenes = os.path.join( self.dir_mosaic, self._str_search )
+                vrt_paths = []
+                for scene in scenes:
+                    if not scene['is_ok']:
+                        return scene
+                    vrt_paths.append( scene['vrt_path'] )
+                band_names = scenes[-1]['band_names']
+
+                filepath = os.path.join( dir_mosaic_scenes, f"{name_mosaic}.vrt")
+                if not ( self.VRT_FROM_META and writeMosaicVRT( filepath, scenes, band_names ) ):
+                    ds_ = gdal.BuildVRT(filepath, vrt_paths)
+                    if ds_ is None:
+                        return {
+                            'is_ok': False,
+                            'message': tr('Error building mosaic VRT for date/orbit/crs {}').format( date_orbit_crs ),
+                            'level': Qgis.Critical
+                        }
+                    if task.isCanceled():
+                        ds_ = None
+                        return messageCancelled()
+
+                    addBandNames( ds_, band_names )
+                    ds_ = None
                 writeVRTSource( filepath, self._tag_att_values_source['vrt'])
 
                 return {
                     'is_ok': True,
                     'filepath': filepath,
+                    'vrt_paths': vrt_paths,
                     'layers': [ vrt.split( os.path.sep)[-1] for vrt in vrt_paths ]
                 }
 
+            def returnError(r:dict)->dict:
+                if task.isCanceled():
+                    self.is_task_canceled = True
+                self.requestProcessData.emit({
+                    'type': 'message_bar',
+                    'data': { 'text': r['message'], 'level': r['level']  }
+                })
+                return { 'is_ok': False }
+
             # self.debug.active() # DEBUG
 
             scene_list = self._client.getScenesByDateOrbitsCRS( self.spatial_resolution )
-            mosaic_count = 0
             self._mosaic_total = len( scene_list )
             msg = tr('Mosaic: {} total (Spatial resolution: {})').format(self._mosaic_total, self.spatial_resolution)
             self.requestProcessData.emit({
                 'type': 'message_log',
                 'data': { 'text': msg, 'level': Qgis.Info }
             })
-            for date_orbit_crs, data in scene_list.items():
-                mosaic_count += 1
-                args = (
-                    self._client.collection['id'],
-                    mosaic_count, self._mosaic_total,
-                    f"{self._client.collection['id']}.{date_orbit_crs}_{self.spatial_resolution}",
-                    len(data)
-                )
-                text = tr("{} - Mosaic {} of {}: {} ({})").format( *args )
-                self.requestProcessData.emit({
-                    'type': 'message_status',
-                    'data': text
-                })
 
-                r = createRasterMosaicVRT( data, date_orbit_crs )
-                if not r['is_ok']:
-                    if task.isCanceled():
-                        self.is_task_canceled = True
+            request_process_data = ThrottledSignal( self.requestProcessData )
+            total_scenes = sum( len( scene ) for data in scene_list.values() for scene in data )
+            progress = ProgressVRTBuild( task, total_scenes )
+            executor = ThreadPoolExecutor( max_workers=self.MOSAIC_WORKERS )
+            try:
+                # Fan out the scene VRTs (remote COGs) of all mosaics
+                futures = {}
+                reused = {}
+                for date_orbit_crs, data in scene_list.items():
+                    name_mosaic = f"{self._client.collection['id']}.{date_orbit_crs}_{self.spatial_resolution}"
+                    ids = frozenset( scene_id for scene in data for scene_id in scene )
+                    built = self._mosaics_built.get( name_mosaic )
+                    is_built = not built is None and built['ids'] == ids and all(
+                        os.path.exists( filepath ) for filepath in [ built['filepath'] ] + built['vrt_paths']
+                    )
+                    if is_built:
+                        # Mosaic not affected by the incremental search
+                        reused[ date_orbit_crs ] = built
+                        for scene_id in ids:
+                            progress.update( scene_id, 1.0 )
+                        continue
+
+                    dir_scenes = os.path.join( self.dir_mosaic, self._str_search, name_mosaic )
+                    os.makedirs(dir_scenes, exist_ok=True)
+                    futures[ date_orbit_crs ] = [
+                        executor.submit( createSceneVRT, dir_scenes, scene_id, band_urls, ( progress, scene_id ) )
+                        for scene in data for scene_id, band_urls in scene.items()
+                    ]
+
+                # Mosaic VRTs (local scene VRTs), in order
+                mosaic_count = 0
+                filepaths = []
+                for date_orbit_crs, data in scene_list.items():
+                    mosaic_count += 1
+                    name_mosaic = f"{self._client.collection['id']}.{date_orbit_crs}_{self.spatial_resolution}"
+                    args = (
+                        self._client.collection['id'],
+                        mosaic_count, self._mosaic_total,
+                        name_mosaic,
+                        len(data)
+                    )
+                    text = tr("{} - Mosaic {} of {}: {} ({})").format( *args )
+                    request_process_data.emit({
+                        'type': 'message_status',
+                        'data': text
+                    })
+
+                    if date_orbit_crs in reused:
+                        r = reused[ date_orbit_crs ]
+                        filepath_cog = self._mosaics_materialized.get( r['filepath'] )
+                        if not filepath_cog is None and os.path.exists( filepath_cog ):
+                            r = r | { 'filepath': filepath_cog }
+                    else:
+                        scenes = [ future.result() for future in futures[ date_orbit_crs ] ]
+                        r = createRasterMosaicVRT( name_mosaic, date_orbit_crs, scenes )
+                        if not r['is_ok']:
+                            return returnError( r )
+
+                        self._mosaics_built[ name_mosaic ] = {
+                            'ids': frozenset( scene_id for scene in data for scene_id in scene ),
+                            'filepath': r['filepath'],
+                            'vrt_paths': r['vrt_paths'],
+                            'layers': r['layers']
+                        }
+                        self._mosaics_materialized.pop( r['filepath'], None ) # COG of previous scenes
+                    
+                    filepaths.append( self._mosaics_built[ name_mosaic ]['filepath'] )
+                    args = {
+                        'filepath': r['filepath'],
+                        'layers': r['layers']
+                    }
                     self.requestProcessData.emit({
-                        'type': 'message_bar',
-                        'data': { 'text': r['message'], 'level': r['level']  }
+                        'type': 'add_layer_mosaic_group',
+                        'data': args
                     })
-                    return { 'is_ok': False }
-                
-                args = {
-                    'filepath': r['filepath'],
-                    'layers': r['layers']
-                }
-                self.requestProcessData.emit({
-                    'type': 'add_layer_mosaic_group',
-                    'data': args
-                })
+            finally:
+                executor.shutdown( wait=True, cancel_futures=True )
+                request_process_data.flush()
 
-            return { 'is_ok': True }
+            return { 'is_ok': True, 'filepaths': filepaths }
                 
         name = f"Create Mosaics - {self._str_search}"
-        task = QgsTask.fromFunction( name, run, on_finished=on_finished )
+        task = QgsTask.fromFunction( name, self._runNetworkProfile( run, name ), on_finished=on_finished )
         self.task_processor.setTask( task, self._client.collection['id'] )
         self.taskManager.addTask( task )
         self.task_id = self.taskManager.taskId( task )
@@ -432,9 +591,110 @@ class StacProcessor(QObject):
             self._onAddMosaicScenes()
             return
 
+        self._search_windows = None
+        if self._is_ok_last_processed:
+            p = {
+                'collection': self._client.collection['id'],
+                'dates': self.dates,
+                'bbox': self.bbox,
+            }
+            self._search_windows = planIncrementalSearch( self._last_search_params, p )
+            if not self._search_windows is None:
+                msg = tr("Incremental search: {} windows not covered by the last search").format( len( self._search_windows ) )
+                self.requestProcessData.emit({
+                    'type': 'message_log',
+                    'data': { 'text': msg, 'level': Qgis.Info }
+                })
+
         self._search() # Call _onAddMosaicScenes after search finished
 
 
+    def materializeMosaics(self, filepaths:List[str])->None:
+        """
+        Background task: local COG of each mosaic VRT (cogmaterializer), the source of mosaic layer is swapped
+        when its COG is finished. A cancelled task is resumed by the next request of same mosaic.
+        The failed mosaics do not stop the others, they are reported at the end. Emit finished.
+        """
+        def on_finished(exception, data:dict)->None:
+            if exception:
+                self.requestProcessData.emit({
+                    'type': 'message_bar',
+                    'data': { 'text': str(exception), 'level': Qgis.Critical }
+                })
+                self.finished.emit()
+                return
+
+            for failure in data['failures']:
+                msg = tr('Materialization of {}: {}').format( os.path.basename( failure['filepath'] ), failure['message'] )
+                self.requestProcessData.emit({
+                    'type': 'message_log',
+                    'data': { 'text': msg, 'level': Qgis.Warning }
+                })
+
+            if data['is_canceled']:
+                msg = tr('Materialization cancelled by user - {} of {} mosaics (the windows copied are kept to resume)')
+                level = Qgis.Warning
+            elif len( data['failures'] ):
+                msg = tr('Materialized {} of {} mosaics, see the message log for the failures')
+                level = Qgis.Critical
+            else:
+                msg = tr('Success - {} of {} mosaics materialized (local COG)')
+                level = Qgis.Success
+            self.requestProcessData.emit({
+                'type': 'message_bar',
+                'data': { 'text': msg.format( data['total_ok'], len( filepaths ) ), 'level': level }
+            })
+
+            self.finished.emit()
+
+        def run(task:QgsTask)->dict:
+            def setProgress(percent:float)->None:
+                task.setProgress( ( count + percent / 100 ) / len( filepaths ) * 100 )
+
+            failures = []
+            total_ok = 0
+            for count, filepath in enumerate( filepaths ):
+                if task.isCanceled():
+                    break
+
+                r = materializeCOG( filepath, task.isCanceled, setProgress, self.MATERIALIZE_WORKERS, self.MATERIALIZE_CHUNK )
+                if not r['is_ok']:
+                    if not task.isCanceled():
+                        failures.append( { 'filepath': filepath, 'message': r['message'] } )
+                    continue
+
+                total_ok += 1
+                self._mosaics_materialized[ filepath ] = r['filepath']
+                self.requestProcessData.emit({
+                    'type': 'swap_layer_source',
+                    'data': { 'source': filepath, 'filepath': r['filepath'] }
+                })
+
+            return { 'total_ok': total_ok, 'failures': failures, 'is_canceled': task.isCanceled() }
+
+        name = f"Materialize Mosaics - {len( filepaths )}"
+        task = QgsTask.fromFunction( name, self._runNetworkProfile( run, name ), on_finished=on_finished )
+        self.task_processor.setTask( task, self._client.collection['id'] )
+        self.taskManager.addTask( task )
+        self.task_id = self.taskManager.taskId( task )
+
+    @pyqtSlot()
+    def materializeSelectedMosaics(self)->None:
+        mosaics = { os.path.normpath( built['filepath'] ) for built in self._mosaics_built.values() }
+        filepaths = [
+            os.path.normpath( layer.source() ) for layer in self.layer_tree_view.selectedLayers()
+            if os.path.normpath( layer.source() ) in mosaics
+        ]
+        if not len( filepaths ):
+            self.requestProcessData.emit({
+                'type': 'message_bar',
+                'data': { 'text': tr('Select the mosaic layers (VRT) to materialize'), 'level': Qgis.Warning }
+            })
+            self.finished.emit()
+            return
+
+        self.materializeMosaics( filepaths )
+
     @pyqtSlot()
     def cancelCurrentTask(self)->None:
         task = self.taskManager.task( self.task_id )
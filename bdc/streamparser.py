@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Stream Parser
+                            Incremental parsing of STAC FeatureCollection
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+from typing import Callable, Iterator, Tuple
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+class StreamError(Exception):
+    pass
+
+
+class TeeReader():
+    """
+    File object over the response that keeps the bytes read (body for the HTTP cache).
+    max_bytes: A larger body is not kept, see 'is_kept'
+    """
+    def __init__(self, fileobj, keep:bool=True, max_bytes:int=None):
+        self._fileobj = fileobj
+        self._chunks = [] if keep else None
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    @property
+    def is_kept(self)->bool:
+        return not self._chunks is None
+
+    def read(self, size:int=-1)->bytes:
+        data = self._fileobj.read( size )
+        self.size += len( data )
+        if not self._chunks is None and data:
+            if not self.max_bytes is None and self.size > self.max_bytes:
+                self._chunks = None
+            else:
+                self._chunks.append( data )
+        return data
+
+    def getvalue(self)->bytes:
+        return b''.join( self._chunks )
+
+
+def isStreamAvailable()->bool:
+    return not ijson is None
+
+
+def iterFeatureCollection(fileobj)->Iterator[Tuple[str, dict]]:
+    """
+    ( 'feature', item ) for each item of 'features' as the bytes arrive,
+    then ( 'result', result ) with the other keys ('links', 'context', ...) and empty 'features'
+    """
+    top = ijson.ObjectBuilder()
+    item = None
+    try:
+        for prefix, event, value in ijson.parse( fileobj, use_float=True ):
+            if prefix == 'features.item' and event == 'start_map':
+                item = ijson.ObjectBuilder()
+            if item is None:
+                top.event( event, value )
+                continue
+
+            item.event( event, value )
+            if prefix == 'features.item' and event == 'end_map':
+                yield ( 'feature', item.value )
+                item = None
+    except ijson.JSONError as err:
+        raise StreamError( str( err ) )
+
+    yield ( 'result', top.value )
+
+
+class SearchPage():
+    """
+    Page of search from the events of fetch:
+        { 'is_ok': True, 'total': int } start of page (features expected)
+        { 'is_ok': True, 'feature': dict } each feature
+        { 'is_ok': True, 'result': dict, 'returned': int } end of page, or { 'is_ok': False, 'message': str }
+    'result' (without the features) and 'message' are known after the features are consumed,
+    then 'total' is the features returned (the first 'total' of a streamed page is estimated).
+    """
+    def __init__(self, events:Iterator[dict], total:int, isNew:Callable[[dict], bool]=None):
+        self._events = events
+        self._isNew = isNew
+        self.total = total
+        self.result = None
+        self.message = None
+        self._count = 0
+        self._is_done = False
+
+    @property
+    def is_ok(self)->bool:
+        return self.message is None
+
+    def features(self)->Iterator[dict]:
+        if self._is_done:
+            return
+
+        for r in self._events:
+            if 'feature' in r:
+                if self._isNew is None or self._isNew( r['feature'] ):
+                    self._count += 1
+                    yield r['feature']
+                continue
+
+            self._is_done = True
+            if r['is_ok']:
+                self.result = r['result']
+                self.total = self._count
+            else:
+                self.message = r['message']
+            return
+
+        self._is_done = True
+
+    def close(self)->None:
+        # Skip the features not consumed
+        for _ in self.features():
+            pass
@@ -19,6 +19,8 @@
 
 import json
 import os
+import threading
+import time
 from typing import Union, List
 
 from qgis.PyQt.QtCore import (
@@ -31,6 +33,8 @@ from qgis.core import (
     QgsLayerTreeGroup,
     QgsLayerTreeLayer,
     QgsVectorLayer, QgsRasterLayer,
+    QgsDataProvider,
+    QgsFeature, QgsJsonUtils,
     QgsMessageLog,
     QgsTask
 )
@@ -39,6 +43,48 @@ from qgis.gui import QgisInterface
 from .translate import tr
 
 
+class ThrottledSignal():
+    """
+    Emit of 'requestProcessData' by worker tasks.
+    The progress payloads are coalesced (last value by type) and emitted at most 'rate' per second,
+    the others are emitted at once, after the pending progress payloads.
+    """
+    COALESCED = ( 'message_status', 'progress_footprint' )
+
+    def __init__(self, signal:pyqtSignal, rate:float=10):
+        self._signal = signal
+        self._interval = 1.0 / rate
+        self._pending = {}
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def _takePending(self)->list:
+        payloads = list( self._pending.values() )
+        self._pending.clear()
+        self._last = time.monotonic()
+        return payloads
+
+    def emit(self, payload:dict)->None:
+        with self._lock:
+            if payload['type'] in self.COALESCED:
+                self._pending[ payload['type'] ] = payload
+                if ( time.monotonic() - self._last ) < self._interval:
+                    return
+                payloads = self._takePending()
+            else:
+                payloads = self._takePending() + [ payload ]
+
+        for item in payloads:
+            self._signal.emit( item )
+
+    def flush(self)->None:
+        with self._lock:
+            payloads = self._takePending()
+
+        for item in payloads:
+            self._signal.emit( item )
+
+
 class TaskProcessor(QObject):
     messageStatus = pyqtSignal(str)
     def __init__(self, iface:QgisInterface, title:str):
@@ -46,6 +92,7 @@ class TaskProcessor(QObject):
         self.project = QgsProject.instance()
         self._task = None
         self._mosaic_group = None
+        self._footprint_preview_id = None
         self.propertyName = title
         self.collection = None
         self.message_log = QgsMessageLog()
@@ -73,7 +120,10 @@ class TaskProcessor(QObject):
             'create_mosaic_group': self.createMosaicGroup,
             'progress_footprint': self.progressFootprint,
             'add_layer_vector': self.addVectorLayer,
-            'add_layer_mosaic_group': self.addLayerMosaicGroup
+            'add_layer_mosaic_group': self.addLayerMosaicGroup,
+            'swap_layer_source': self.swapLayerSource,
+            'add_footprint_preview': self.addFootprintPreview,
+            'remove_footprint_preview': self.removeFootprintPreview
         }
         methods[ payload['type'] ]( payload['data'] )
 
@@ -123,3 +173,44 @@ class TaskProcessor(QObject):
         layer = QgsRasterLayer( status['filepath'], name )
         layer.setCustomProperty( self.propertyName, json.dumps({ 'layers': status['layers'] }) )
         self._addLayerToMosaicGroup( layer )
+
+    def swapLayerSource(self, source:dict)->None:
+        # Mosaic VRT -> local COG (materialized)
+        filepath = os.path.normpath( source['source'] )
+        for layer in self.project.mapLayers().values():
+            if not isinstance( layer, QgsRasterLayer ) or not os.path.normpath( layer.source() ) == filepath:
+                continue
+
+            layer.setDataSource( source['filepath'], layer.name(), 'gdal', QgsDataProvider.ProviderOptions() )
+            layer.triggerRepaint()
+
+    def addFootprintPreview(self, features:dict)->None:
+        # Memory layer with the footprints of pages while searching
+        layer = None if self._footprint_preview_id is None else self.project.mapLayer( self._footprint_preview_id )
+        if layer is None:
+            layer = QgsVectorLayer( 'MultiPolygon?crs=EPSG:4326&field=id:string(100)', tr('Footprint (searching...)'), 'memory' )
+            layer.setOpacity( 0.5 )
+            self.project.addMapLayer( layer, addToLegend=False )
+            root = self.project.layerTreeRoot()
+            root.insertLayer(0, layer )
+            self._footprint_preview_id = layer.id()
+
+        feats = []
+        for id, data in features.items():
+            geom = QgsJsonUtils.geometryFromGeoJson( json.dumps( data['geometry'] ) )
+            geom.convertToMultiType()
+            feature = QgsFeature( layer.fields() )
+            feature.setGeometry( geom )
+            feature.setAttributes( [ id ] )
+            feats.append( feature )
+        layer.dataProvider().addFeatures( feats )
+        layer.updateExtents()
+        layer.triggerRepaint()
+
+    def removeFootprintPreview(self, data:None)->None:
+        if self._footprint_preview_id is None:
+            return
+
+        if not self.project.mapLayer( self._footprint_preview_id ) is None:
+            self.project.removeMapLayer( self._footprint_preview_id )
+        self._footprint_preview_id = None
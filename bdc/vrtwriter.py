@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ VRT Writer
+                            VRT of scenes and mosaics from raster metadata
+                             -------------------
+        begin                : 2026-10-18
+        copyright            : (C) 2026 by Luiz Motta
+        email                : motta.luiz@gmail.com
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+ """
+
+import os
+import sys
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from typing import List, Union
+
+from osgeo import gdal, osr
+
+
+"""
+Raster metadata (meta), same for the bands of one spatial resolution of scene:
+    {
+        'xsize': int, 'ysize': int,
+        'geotransform': [ 6 float ],
+        'srs': str (WKT),
+        'dtype': str (GDAL name, as 'UInt16'),
+        'nodata': float | None,
+        'block': [ int, int ] | None,
+        'overviews': [ [ int, int ] ] | None
+    }
+"""
+
+STAC_DTYPES = {
+    'uint8': 'Byte', 'int8': 'Int8',
+    'uint16': 'UInt16', 'int16': 'Int16',
+    'uint32': 'UInt32', 'int32': 'Int32',
+    'uint64': 'UInt64', 'int64': 'Int64',
+    'float32': 'Float32', 'float64': 'Float64'
+}
+
+
+@lru_cache( maxsize=64 )
+def srsWkt(epsg:int)->Union[str, None]:
+    sr = osr.SpatialReference()
+    if not sr.ImportFromEPSG( epsg ) == 0:
+        return None
+    return sys.intern( sr.ExportToWkt() )
+
+
+def rasterMetaFromStac(asset:dict, properties:dict)->Union[dict, None]:
+    """
+    From projection ('proj:shape', 'proj:transform', 'proj:epsg'/'proj:code') and raster ('raster:bands') extensions,
+    the asset has priority. None when incomplete.
+    """
+    def get(key:str):
+        return asset[ key ] if key in asset else properties.get( key )
+
+    shape = get('proj:shape')
+    transform = get('proj:transform')
+    raster_bands = asset.get('raster:bands') or []
+    dtype = STAC_DTYPES.get( raster_bands[0].get('data_type') ) if len( raster_bands ) else None
+    epsg = get('proj:epsg')
+    if epsg is None and isinstance( get('proj:code'), str ) and get('proj:code').upper().startswith('EPSG:'):
+        epsg = get('proj:code').split(':')[1]
+    if shape is None or transform is None or len( transform ) < 6 or dtype is None or epsg is None:
+        return None
+
+    srs = srsWkt( int( epsg ) )
+    if srs is None:
+        return None
+
+    ( a, b, c, d, e, f ) = transform[:6]
+    return {
+        'xsize': int( shape[1] ), 'ysize': int( shape[0] ),
+        'geotransform': [ c, a, b, f, d, e ],
+        'srs': srs,
+        'dtype': dtype,
+        'nodata': raster_bands[0].get('nodata'),
+        'block': None,
+        'overviews': None
+    }
+
+
+def rasterMetaFromDataset(ds:gdal.Dataset)->dict:
+    band = ds.GetRasterBand(1)
+    return {
+        'xsize': ds.RasterXSize, 'ysize': ds.RasterYSize,
+        'geotransform': list( ds.GetGeoTransform() ),
+        'srs': sys.intern( ds.GetProjection() ),
+        'dtype': gdal.GetDataTypeName( band.DataType ),
+        'nodata': band.GetNoDataValue(),
+        'block': list( band.GetBlockSize() ),
+        'overviews': [
+            [ band.GetOverview( idx ).XSize, band.GetOverview( idx ).YSize ]
+            for idx in range( band.GetOverviewCount() )
+        ]
+    }
+
+
+@lru_cache( maxsize=64 )
+def axisMapping(srs:str)->str:
+    """
+    Data axis to SRS axis mapping of VRT, traditional GIS order (east, north), as '2,1' for EPSG:4326
+    """
+    sr = osr.SpatialReference()
+    if not sr.ImportFromWkt( srs ) == 0:
+        return '1,2'
+    sr.SetAxisMappingStrategy( osr.OAMS_TRADITIONAL_GIS_ORDER )
+    return ','.join( str( axis ) for axis in sr.GetDataAxisToSRSAxisMapping() )
+
+
+def isSameGrid(meta:dict, other:dict)->bool:
+    keys = ( 'xsize', 'ysize', 'srs', 'dtype', 'nodata' )
+    if any( not meta[ key ] == other[ key ] for key in keys ):
+        return False
+    return all( abs( a - b ) <= 1e-9 * max( abs( a ), abs( b ), 1.0 ) for a, b in zip( meta['geotransform'], other['geotransform'] ) )
+
+
+def _format(value:float)->str:
+    return repr( float( value ) ) if not float( value ).is_integer() else str( int( value ) )
+
+
+def _addDatasetHeader(root:ET.Element, meta:dict)->None:
+    ET.SubElement( root, 'SRS', { 'dataAxisToSRSAxisMapping': axisMapping( meta['srs'] ) } ).text = meta['srs']
+    ET.SubElement( root, 'GeoTransform' ).text = ', '.join( repr( float( v ) ) for v in meta['geotransform'] )
+
+
+def _addSource(
+        band:ET.Element,
+        filename:str,
+        relative:bool,
+        meta:dict,
+        dst_offset:tuple=( 0, 0 )
+    )->None:
+    is_nodata = not meta['nodata'] is None
+    source = ET.SubElement( band, 'ComplexSource' if is_nodata else 'SimpleSource' )
+    ET.SubElement( source, 'SourceFilename', { 'relativeToVRT': '1' if relative else '0' } ).text = filename
+    ET.SubElement( source, 'SourceBand' ).text = '1' if not 'band' in meta else str( meta['band'] )
+    properties = {
+        'RasterXSize': str( meta['xsize'] ), 'RasterYSize': str( meta['ysize'] ),
+        'DataType': meta['dtype']
+    }
+    if meta.get('block'):
+        properties |= { 'BlockXSize': str( meta['block'][0] ), 'BlockYSize': str( meta['block'][1] ) }
+    ET.SubElement( source, 'SourceProperties', properties )
+    size = { 'xSize': str( meta['xsize'] ), 'ySize': str( meta['ysize'] ) }
+    ET.SubElement( source, 'SrcRect', { 'xOff': '0', 'yOff': '0' } | size )
+    ET.SubElement( source, 'DstRect', { 'xOff': str( dst_offset[0] ), 'yOff': str( dst_offset[1] ) } | size )
+    if is_nodata:
+        ET.SubElement( source, 'NODATA' ).text = _format( meta['nodata'] )
+
+
+def _write(root:ET.Element, filepath:str)->None:
+    ET.indent( root, space='  ' )
+    ET.ElementTree( root ).write( filepath, encoding='utf-8' )
+
+
+def writeSceneVRT(filepath:str, urls:List[str], band_names:List[str], meta:dict)->None:
+    """
+    One band by COG (band 1 of each URL), as gdal.BuildVRT with 'separate'.
+    The bands of scene have the same meta (same spatial resolution).
+    """
+    root = ET.Element( 'VRTDataset', { 'rasterXSize': str( meta['xsize'] ), 'rasterYSize': str( meta['ysize'] ) } )
+    _addDatasetHeader( root, meta )
+    for idx, ( url, name ) in enumerate( zip( urls, band_names ) ):
+        band = ET.SubElement( root, 'VRTRasterBand', { 'dataType': meta['dtype'], 'band': str( idx + 1 ) } )
+        ET.SubElement( band, 'Description' ).text = name
+        if not meta['nodata'] is None:
+            ET.SubElement( band, 'NoDataValue' ).text = _format( meta['nodata'] )
+        _addSource( band, f"/vsicurl/{url}", False, meta )
+
+    _write( root, filepath )
+
+
+def writeMosaicVRT(filepath:str, scenes:List[dict], band_names:List[str])->bool:
+    """
+    scenes: [ { 'vrt_path', 'meta' } ] with same CRS and resolution, north-up.
+    Return False when the scenes can not be aligned (pixel grid, data type, nodata), use gdal.BuildVRT.
+    """
+    metas = [ scene['meta'] for scene in scenes ]
+    gt = metas[0]['geotransform']
+    ( res_x, res_y ) = ( gt[1], gt[5] )
+    for meta in metas:
+        g = meta['geotransform']
+        if not ( g[2] == 0 and g[4] == 0 ) or abs( g[1] - res_x ) > 1e-9 * abs( res_x ) or abs( g[5] - res_y ) > 1e-9 * abs( res_y ):
+            return False
+        if any( not meta[ key ] == metas[0][ key ] for key in ( 'srs', 'dtype', 'nodata' ) ):
+            return False
+
+    min_x = min( meta['geotransform'][0] for meta in metas )
+    max_y = max( meta['geotransform'][3] for meta in metas )
+    max_x = max( meta['geotransform'][0] + meta['xsize'] * res_x for meta in metas )
+    min_y = min( meta['geotransform'][3] + meta['ysize'] * res_y for meta in metas )
+    xsize = int( round( ( max_x - min_x ) / res_x ) )
+    ysize = int( round( ( min_y - max_y ) / res_y ) )
+
+    # Origins on the same pixel grid
+    for meta in metas:
+        for value in ( ( meta['geotransform'][0] - min_x ) / res_x, ( meta['geotransform'][3] - max_y ) / res_y ):
+            if abs( value - round( value ) ) > 1e-6:
+                return False
+
+    mosaic_meta = metas[0] | { 'geotransform': [ min_x, res_x, 0.0, max_y, 0.0, res_y ] }
+    root = ET.Element( 'VRTDataset', { 'rasterXSize': str( xsize ), 'rasterYSize': str( ysize ) } )
+    _addDatasetHeader( root, mosaic_meta )
+    dir_vrt = os.path.dirname( filepath )
+    for idx, name in enumerate( band_names ):
+        band = ET.SubElement( root, 'VRTRasterBand', { 'dataType': mosaic_meta['dtype'], 'band': str( idx + 1 ) } )
+        ET.SubElement( band, 'Description' ).text = name
+        if not mosaic_meta['nodata'] is None:
+            ET.SubElement( band, 'NoDataValue' ).text = _format( mosaic_meta['nodata'] )
+        for scene, meta in zip( scenes, metas ):
+            offset = (
+                int( round( ( meta['geotransform'][0] - min_x ) / res_x ) ),
+                int( round( ( meta['geotransform'][3] - max_y ) / res_y ) )
+            )
+            source_meta = meta | { 'band': idx + 1, 'block': [ 128, 128 ] } # Block of VRT
+            _addSource( band, os.path.relpath( scene['vrt_path'], dir_vrt ), True, source_meta, offset )
+
+    _write( root, filepath )
+    return True
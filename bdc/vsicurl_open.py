@@ -18,19 +18,92 @@ Open URL for QGIS
  ***************************************************************************/
  """
 
+import json
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
 from osgeo import gdal
 
-def setConfigOptionUrl()->None:
-    gdal.SetConfigOption('CPL_VSICURL_TIMEOUT', '45')
-    gdal.SetConfigOption('CPL_VSICURL_CONNECT_TIMEOUT', '10')
-    gdal.SetConfigOption('CPL_VSICURL_RETRIES', '2')
-    gdal.SetConfigOption('CPL_VSICURL_RETRY_DELAY', '3')
+# Network profile of /vsicurl/ (COG), see networkProfile
+NETWORK_PROFILE = {
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR', # No listing of directory on open
+    'CPL_VSICURL_ALLOWED_EXTENSIONS': '.tif,.TIF,.tiff,.TIFF',
+    'GDAL_HTTP_MULTIPLEX': 'YES',
+    'GDAL_HTTP_VERSION': '2',
+    'GDAL_HTTP_MERGE_CONSECUTIVE_RANGES': 'YES',
+    'GDAL_INGESTED_BYTES_AT_OPEN': '32768', # Header of COG in the first request
+    'VSI_CACHE': 'TRUE',
+    'VSI_CACHE_SIZE': str( 64 * 1024 * 1024 ), # By file
+    'CPL_VSIL_CURL_CACHE_SIZE': str( 256 * 1024 * 1024 ), # Global, shared by files
+    'GDAL_HTTP_TIMEOUT': '45',
+    'GDAL_HTTP_CONNECTTIMEOUT': '10',
+    'GDAL_HTTP_MAX_RETRY': '3',
+    'GDAL_HTTP_RETRY_DELAY': '1'
+}
+
+_profile_lock = threading.Lock()
+_profile_count = 0
+_profile_previous = {}
+
+def setConfigOptionUrl(options:dict=None)->None:
+    """
+    options: Override NETWORK_PROFILE, a None value removes the option
+    """
+    options = NETWORK_PROFILE | ( {} if options is None else options )
+    for key, value in options.items():
+        if not key in _profile_previous:
+            _profile_previous[ key ] = gdal.GetConfigOption( key )
+        gdal.SetConfigOption( key, None if value is None else str( value ) )
 
 def setConfigClearUrl()->None:
-    gdal.SetConfigOption('CPL_VSICURL_TIMEOUT', None)
-    gdal.SetConfigOption('CPL_VSICURL_CONNECT_TIMEOUT', None)
-    gdal.SetConfigOption('CPL_VSICURL_RETRIES', None)
-    gdal.SetConfigOption('CPL_VSICURL_RETRY_DELAY', None)
+    for key, value in _profile_previous.items():
+        gdal.SetConfigOption( key, value )
+    _profile_previous.clear()
+
+def networkStats()->dict:
+    """
+    Totals of GDAL network (CPL_VSIL_NETWORK_STATS_ENABLED), empty when not supported
+    """
+    if not hasattr( gdal, 'NetworkStatsGetAsSerializedJSON' ):
+        return {}
+
+    stats = json.loads( gdal.NetworkStatsGetAsSerializedJSON() or '{}' )
+    methods = stats.get( 'methods', {} )
+    return {
+        'requests': sum( value.get( 'count', 0 ) for value in methods.values() ),
+        'downloaded_bytes': sum( value.get( 'downloaded_bytes', 0 ) for value in methods.values() ),
+        'methods': { method: value.get( 'count', 0 ) for method, value in methods.items() }
+    }
+
+@contextmanager
+def networkProfile(options:dict=None, stats:bool=False)->Iterator[dict]:
+    """
+    Scoped GDAL config options of network (process wide, used by the threads of tasks).
+    Nested or concurrent scopes share the options of the first scope,
+    the previous options are restored when the last scope exits.
+    options: Override NETWORK_PROFILE, from "gdal_config" of collection.json
+    stats: Yield dict filled with networkStats() at exit
+    """
+    global _profile_count
+
+    with _profile_lock:
+        if _profile_count == 0:
+            setConfigOptionUrl( ( options or {} ) | ( { 'CPL_VSIL_NETWORK_STATS_ENABLED': 'YES' } if stats else {} ) )
+            if stats and hasattr( gdal, 'NetworkStatsReset' ):
+                gdal.NetworkStatsReset()
+        _profile_count += 1
+
+    result = {}
+    try:
+        yield result
+    finally:
+        with _profile_lock:
+            if stats:
+                result |= networkStats()
+            _profile_count -= 1
+            if _profile_count == 0:
+                setConfigClearUrl()
 
 
 def openUrl(url:str)->dict: